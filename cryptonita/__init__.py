@@ -23,6 +23,6 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 '''
 
 try:
-    from .conv import B, load_bytes
+    from .conv import B, load_bytes, as_bytes_batch
 except ImportError:
     pass  # this happens when importing from setup.py
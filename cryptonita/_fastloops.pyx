@@ -0,0 +1,25 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+''' Compiled versions of the innermost byte loops of cryptonita.
+
+    This module is optional: it is built only if Cython is available
+    when cryptonita is installed and the callers fall back to their
+    pure Python (or numpy) versions if it cannot be imported.
+    '''
+
+
+def ixor_bytes(unsigned char[::1] dst, const unsigned char[::1] src, Py_ssize_t n):
+    ''' Xor the first <n> bytes of <src> into <dst> in place.
+        <dst> must be writable (like a bytearray).
+        '''
+    cdef Py_ssize_t i
+
+    # the bounds are not checked in the loop: check them once here
+    if n < 0 or n > dst.shape[0] or n > src.shape[0]:
+        raise ValueError(
+            "Cannot xor %i bytes: the buffers have %i and %i bytes." %
+            (n, dst.shape[0], src.shape[0])
+        )
+
+    # a plain loop over bytes: the C compiler vectorizes it
+    for i in range(n):
+        dst[i] ^= src[i]
@@ -2,10 +2,13 @@ from cryptonita.mixins import (
     SequenceMixin, MutableSequenceMixin, ByteStatsMixin, SequenceStatsMixin
 )
 
-from cryptonita.deps import importdep
+from cryptonita.deps import importdep, isinstalled
+from cryptonita.helpers import _MAX_CACHED_LEN
 
 np = importdep('numpy')
 
+import collections
+import functools
 from collections.abc import Iterable, Callable
 '''
 >>> from cryptonita import B           # byexample: +timeout=10
@@ -79,6 +82,40 @@ class ImmutableByteString(
     def toarray(self):
         return np.array(tuple(self))
 
+    def _as_rows_np(self):
+        if not isinstalled(np):
+            return None
+        return np.frombuffer(self, dtype=np.uint8).reshape(-1, 1)
+
+    def freq(self):
+        r''' Count how many times each byte is in the string.
+
+            An immutable byte string never changes so the frequencies
+            of the short ones are computed once and cached; a copy is
+            returned so the caller can modify it freely:
+
+            >>> s = B(b'ABA')
+            >>> f = s.freq()
+            >>> f[65] = 0
+            >>> s.freq()
+            Counter({65: 2, 66: 1})
+        '''
+        if len(self) > _MAX_CACHED_LEN:
+            return _byte_freq(self)
+        return _cached_freq(self).copy()
+
+    def _freq(self):
+        if len(self) > _MAX_CACHED_LEN:
+            return _byte_freq(self)
+        return _cached_freq(self)
+
+    def most_common(self, n):
+        # the bytes sorted by their count are cached like the frequencies
+        # (for short strings only) so they are not sorted again on each call
+        if len(self) > _MAX_CACHED_LEN:
+            return super().most_common(n)
+        return _cached_ranking(self)[:n]
+
     def fhex(self, n=8):
         return super().hex()[:n]
 
@@ -241,6 +278,51 @@ class ImmutableByteString(
         return MutableByteString(self)
 
 
+def _byte_freq(s):
+    if len(s) >= 2048 and isinstalled(np):
+        return _byte_freq_np(s)
+    return collections.Counter(s)
+
+
+_cached_freq = functools.lru_cache(maxsize=256)(_byte_freq)
+
+
+@functools.lru_cache(maxsize=256)
+def _cached_ranking(s):
+    return tuple(b for b, _ in _cached_freq(s).most_common())
+
+
+def _byte_freq_np(s):
+    ''' Count the bytes of <s> like collections.Counter(s) but with
+        a numpy histogram.
+
+        The bytes are added to the Counter in order of first appearance,
+        like Counter does, so the bytes with the same count are listed
+        in the same order (see Counter.most_common):
+
+        >>> from cryptonita.bytestrings import _byte_freq_np
+        >>> _byte_freq_np(b'BAAB')
+        Counter({66: 2, 65: 2})
+
+        >>> _byte_freq_np(b'BAAB' * 5000)
+        Counter({66: 10000, 65: 10000})
+    '''
+    arr = np.frombuffer(s, dtype=np.uint8)
+    counts = np.bincount(arr, minlength=256)
+    keys = np.flatnonzero(counts)
+
+    if len(arr) < 16384:
+        first_seen = np.full(256, len(arr), dtype=np.intp)
+        np.minimum.at(first_seen, arr, np.arange(len(arr)))
+        keys = keys[np.argsort(first_seen[keys])]
+    else:
+        # tracking the position of every byte costs more than looking
+        # for the first appearance of each one with s.find (a memchr)
+        keys = np.array(sorted(keys.tolist(), key=s.find), dtype=np.intp)
+
+    return collections.Counter(dict(zip(keys.tolist(), counts[keys].tolist())))
+
+
 class MutableByteString(MutableSequenceMixin, bytearray):
     ''' Enhanced version of a mutable byte string.
 
@@ -259,5 +341,17 @@ class MutableByteString(MutableSequenceMixin, bytearray):
     def tobytes(self):
         return bytes(self)
 
+    def freq(self):
+        ''' Count how many times each byte is in the string.
+
+            A mutable string may change so, unlike ImmutableByteString,
+            its frequencies are not cached.
+
+            >>> s = B(b'ABA', mutable=True)
+            >>> s.freq()
+            Counter({65: 2, 66: 1})
+        '''
+        return _byte_freq(self)
+
     def toarray(self):
         return np.array(tuple(self))
@@ -1,6 +1,7 @@
 '''
 >>> from cryptonita.conv import B           # byexample: +timeout=10
 >>> from cryptonita.conv import as_bytes, transpose, uniform_length, reinterpret, join_bytestrings
+>>> from cryptonita.conv import as_bytes_batch, load_bytes
 >>> from cryptonita.bytestrings import MutableByteString, ImmutableByteString
 '''
 
@@ -14,6 +15,11 @@ def as_bytes(raw, encoding='ascii', mutable=False):
             >>> as_bytes(b'\x00\x01')
             '\x00\x01'
 
+         - from any other buffer like a memoryview (of a mmap, for example)
+
+            >>> as_bytes(memoryview(b'\x00\x01\x02')[1:])
+            '\x01\x02'
+
          - from an iterable of integers
 
             >>> as_bytes([0, 1])
@@ -34,6 +40,13 @@ def as_bytes(raw, encoding='ascii', mutable=False):
             >>> as_bytes(as_bytes(b'\x00\x01'))
             '\x00\x01'
 
+         As an immutable byte string cannot be modified, the same object
+         is returned without copying it:
+
+            >>> b = as_bytes(b'\x00\x01')
+            >>> as_bytes(b) is b
+            True
+
          - from a text (str) we need to pass which encoding to use to decode
          the string to bytes:
 
@@ -61,12 +74,21 @@ def as_bytes(raw, encoding='ascii', mutable=False):
             >>> as_bytes(b'020b', encoding=16)
             '\x02\x0b'
 
+            >>> as_bytes(b'112NEpo7TZRRrLZSi2U', encoding=58)
+            '\x00\x00Hello World!'
+
          - for convenience, spaces and newlines are ignored when <encoding>
          is 16, 64, ...
 
             >>> as_bytes(b'02 0b\n03', encoding=16)
             '\x02\x0b\x03'
 
+         - in base 64 anything after the padding is ignored too, like
+         base64.b64decode does
+
+            >>> as_bytes(u'QUJDRA==QUJD', encoding=64)
+            'ABCD'
+
          - we can do the same with a text (str). In this case we assume that
          the encoding to map the unicode to the raw bytes is 'ascii',
          then we use <encoding> to map it to its final state
@@ -92,9 +114,33 @@ def as_bytes(raw, encoding='ascii', mutable=False):
             True
 
         '''
+    # fast path: plain bytes/bytearray without any decoding is by far
+    # the most common case so skip all the checks below
+    t = type(raw)
+    if encoding == 'ascii':
+        # an immutable byte string can be shared, no need to copy it
+        if t is ImmutableByteString and not mutable:
+            return raw
+        # note: a bytes subclass cannot share the buffer of a bytes
+        # object so one copy is unavoidable, but only one
+        if t is bytes or t is bytearray or t is memoryview:
+            return MutableByteString(raw) if mutable else ImmutableByteString(raw)
+
     if hasattr(raw, 'read'):
         raw = raw.read()
 
+    # the decoder to apply once we have the raw bytes, if any:
+    # for 'upper'/'lower' and for base 16, 64, ... encodings
+    decode = _decoders.get(encoding)
+    if decode is None and isinstance(encoding, int):
+        raise ValueError("Unsupported encoding: base %i" % encoding)
+
+    # short encoded literals (keys, IVs, ...) are typically decoded
+    # again and again with the same input so cache them
+    if decode is not None and (t is bytes or t is str) and len(raw) <= 256:
+        raw = _decode_cached(raw, encoding)
+        return MutableByteString(raw) if mutable else raw
+
     # see a single byte as a byte string
     #   as_bytes(7) -> b'\x07'
     if isinstance(raw, int):
@@ -103,16 +149,10 @@ def as_bytes(raw, encoding='ascii', mutable=False):
     # for a unicode, encode it to bytes
     #   as_bytes(u'text', encoding='utf8') -> b'text' (encode: utf8)
     elif isinstance(raw, str):
-        if isinstance(encoding, int):
-            # if the encoding is an integer means that it is
-            # for decoding the string later.
-            # Assume that encoding is then 'ascii'
-            enc = 'ascii'
-        elif encoding in ('upper', 'lower'):
-            enc = 'ascii'
-        else:
-            enc = encoding
-
+        # if there is a decoder for the encoding means that it is
+        # for decoding the string later.
+        # Assume that encoding is then 'ascii'
+        enc = 'ascii' if decode is not None else encoding
         raw = raw.encode(enc, errors='strict')
 
     elif getattr(np, 'ndarray', None) is not None and isinstance(raw, np.ndarray):
@@ -128,29 +168,57 @@ def as_bytes(raw, encoding='ascii', mutable=False):
     else:
         raw = raw
 
-    # support for 'academic' encoded strings
-    if encoding in ('upper', 'lower'):
-        raw = raw.replace(b' ', b'')
-        if (encoding == 'upper' and not raw.isupper()) or \
-                (encoding == 'lower' and not raw.islower()):
+    if decode is not None:
+        raw = decode(raw)
+
+    return MutableByteString(raw) if mutable else ImmutableByteString(raw)
+
+
+def _academic_decoder(encoding):
+    ''' Build a decoder for the 'academic' encoded strings: text
+        with only uppercase (or lowercase) letters and spaces where
+        each letter is mapped to a number: A -> 0, B -> 1, ...
+        '''
+    offset = ord('A') if encoding == 'upper' else ord('a')
+    table = bytes((b - offset) % 256 for b in range(256))
+    is_valid = bytes.isupper if encoding == 'upper' else bytes.islower
+
+    def decode(raw):
+        raw = bytes(raw).replace(b' ', b'')
+        if not is_valid(raw) or min(raw) < offset:
             raise ValueError("text must contain %scase plus spaces only." % encoding)
 
-        offset = ord('A') if encoding == 'upper' else ord('a')
-        raw = bytes(r - offset for r in raw)
+        return raw.translate(table)
 
-    # overloaded meaning of encoding, the new raw bytes are encoded
-    # using base 16 (64, other) and we want to decode them.
-    if isinstance(encoding, int):
-        raw = raw.replace(b' ', b'').replace(b'\n', b'')
-        if encoding == 16:
-            raw = raw.upper()
+    return decode
 
-        if encoding == 58:
-            raw = base58.b58decode(raw)
-        else:
-            raw = getattr(base64, 'b%idecode' % encoding)(raw)
 
-    return MutableByteString(raw) if mutable else ImmutableByteString(raw)
+def _base_decoder(b_decode):
+    ''' Build a decoder for strings encoded in base 16, 64, ...
+        using the function <b_decode>. For convenience, spaces and
+        newlines are ignored.
+        '''
+    def decode(raw):
+        return b_decode(raw.translate(None, b' \n'))
+
+    return decode
+
+
+def _b64decode(raw):
+    ''' Decode a base 64 string with pybase64 if it is installed or
+        with base64.b64decode otherwise.
+
+        pybase64 rejects data after the padding while base64.b64decode
+        ignores it: retry with the latter so the result does not depend
+        on which one is installed.
+        '''
+    if _fast_b64decode is not None:
+        try:
+            return _fast_b64decode(raw)
+        except binascii.Error:
+            pass
+
+    return base64.b64decode(raw)
 
 
 def load_bytes(fp, mode='rt', **k):
@@ -166,13 +234,71 @@ def load_bytes(fp, mode='rt', **k):
 
         Return an iterator of ByteStrings.
 
+            >>> import io
+            >>> list(load_bytes(io.StringIO('AB\n  CD \n\nEF')))
+            ['AB', 'CD', '', 'EF']
+
         '''
     if isinstance(fp, str):
-        fp = open(fp, mode)
+        # read the file in larger chunks than the default (few KiB):
+        # wordlists and ciphertext dumps are typically large
+        fp = open(fp, mode, buffering=64 * 1024)
 
     return (as_bytes(line.strip(), **k) for line in fp)
 
 
+def as_bytes_batch(raws, encoding=16, mutable=False):
+    r'''Create a list of strings of bytes from the iterable <raws>,
+        one per item, using the same <encoding> for all of them.
+
+        This is equivalent to [as_bytes(r, encoding) for r in raws]
+        but for base 16 all the items are decoded in a single call
+        amortizing the per-call cost of as_bytes.
+
+            >>> as_bytes_batch(['020b', b'41 42\n43', ''])
+            ['\x02\x0b', 'ABC', '']
+
+        Each item must be a complete base 16 string by its own:
+
+            >>> as_bytes_batch(['020', 'b'])
+            Traceback<...>
+            binascii.Error: Odd-length string
+
+        Other encodings are supported too but the items are decoded one
+        by one (base 64 strings cannot be concatenated because of their
+        padding):
+
+            >>> as_bytes_batch(['QQ==', 'QkM='], encoding=64)
+            ['A', 'BC']
+        '''
+    if encoding != 16:
+        return [as_bytes(r, encoding=encoding, mutable=mutable) for r in raws]
+
+    parts = []
+    for raw in raws:
+        if isinstance(raw, str):
+            raw = raw.encode('ascii', errors='strict')
+
+        # spaces and newlines are ignored (like in as_bytes)
+        raw = raw.translate(None, b' \n')
+        if len(raw) % 2 != 0:
+            raise binascii.Error("Odd-length string")
+
+        parts.append(raw)
+
+    decoded = memoryview(binascii.unhexlify(b''.join(parts)))
+
+    wrap = MutableByteString if mutable else ImmutableByteString
+    output = []
+    pos = 0
+    for raw in parts:
+        n = len(raw) // 2
+        output.append(wrap(decoded[pos:pos + n]))
+        pos += n
+
+    return output
+
+
 # alias
 B = as_bytes
 
@@ -238,19 +364,42 @@ def transpose(sequences, allow_holes=False, fill_value=None):
         '''
 
     l = len(sequences[0])
-    if not allow_holes:
-        for i, seq in enumerate(sequences, 1):
-            if len(seq) != l:
+    for i, seq in enumerate(sequences, 1):
+        if len(seq) != l:
+            if not allow_holes:
                 raise ValueError(
                     "Sequences have different length: first sequence has %i bytes but the %ith has %i."
                     % (l, i, len(seq))
                 )
+            break
+    else:
+        # All the sequences have the same length so each column is
+        # a strided slice of the concatenation of them: this is done
+        # entirely in C without creating an integer per byte.
+        try:
+            joined = b''.join(sequences)
+        except TypeError:
+            pass  # not bytes-like sequences, go with the generic way
+        else:
+            # for "tall" matrices (lot of short sequences) numpy's
+            # transpose is faster (~2x) than the strided slicing
+            if len(sequences) > l and isinstalled(np):
+                rows = np.frombuffer(joined, dtype=np.uint8)
+                rows = rows.reshape(len(sequences), l)
+                return [ImmutableByteString(col) for col in np.ascontiguousarray(rows.T)]
 
-    output = []
-    for column in itertools.zip_longest(*sequences, fillvalue=fill_value):
-        output.append(B(b for b in column if b is not None))
+            return [ImmutableByteString(joined[j::l]) for j in range(l)]
 
-    return output
+    columns = itertools.zip_longest(*sequences, fillvalue=fill_value)
+
+    # each column is a tuple of integers so we can build the byte strings
+    # directly without going through the as_bytes' dispatch.
+    # Only when there are holes and no fill value we need to filter
+    # the missing bytes (None) out.
+    if allow_holes and fill_value is None:
+        return [ImmutableByteString(b for b in column if b is not None) for column in columns]
+
+    return [ImmutableByteString(column) for column in columns]
 
 
 def uniform_length(sequences, *, drop=0, length=None):
@@ -286,6 +435,17 @@ def uniform_length(sequences, *, drop=0, length=None):
             ['ABCD',
              'ABCD']
 
+        The sequences that survive keep their original order:
+
+            >>> uniform_length([B('AB'), B('1'), B('XYZ')], drop=0.4)
+            ['AB', 'XY']
+
+        Without sequences there is no length to cut them to:
+
+            >>> uniform_length([])
+            Traceback <...>
+            ValueError: No sequences were given.
+
         Alternatively, you can set the wanted length:
 
             >>> uniform_length(seqs, length=3)     # byexample: +norm-ws
@@ -293,40 +453,47 @@ def uniform_length(sequences, *, drop=0, length=None):
              '987',
              'ABC',
              'ABC']
+
+            >>> uniform_length([B('AB'), B('CD')], length=2)
+            ['AB', 'CD']
     '''
 
     if length is not None:
+        # nothing to do (quite common): return a copy of the list
+        # without slicing any sequence
+        if set(map(len, sequences)) == {length}:
+            return list(sequences)
+
         return [
-            seq[:length] if len(seq) != length else seq for seq in sequences if len(seq) >= length
+            seq if l == length else seq[:length] for seq, l in zip(sequences, map(len, sequences))
+            if l >= length
         ]
 
-    sequences, original_idxs = zip(
-        *sorted(
-            ((s, idx) for idx, s in enumerate(sequences)),
-            key=lambda seq_idx: (len(seq_idx[0]), seq_idx[1])
-        )
-    )
-
     sequences = list(sequences)
+    if not sequences:
+        raise ValueError("No sequences were given.")
 
     slens = [len(seq) for seq in sequences]
 
+    # the length of the <idx>-th shortest sequence: there is no need
+    # to sort the sequences, just find that length
     idx = min(int(drop * len(sequences)), len(sequences) - 1)
-    min_len = slens[idx]
-
-    ilow = bisect.bisect_left(slens, min_len, 0, idx)
-    ihi = bisect.bisect_right(slens, min_len, idx)
-
-    # cut the too large
-    sequences[ihi:] = [seq[:min_len] for seq in sequences[ihi:]]
-
-    # drop all the sequences too short
-    sequences = sequences[ilow:]
-
-    # restore the original order
-    sequences, _ = zip(*sorted(zip(sequences, original_idxs), key=lambda seq_idx: seq_idx[1]))
+    if idx == 0:
+        min_len = min(slens)
+    elif idx < len(slens) // 64:
+        min_len = heapq.nsmallest(idx + 1, slens)[-1]
+    elif len(slens) >= 256 and isinstalled(np):
+        # partial sort, O(n)
+        lens = np.fromiter(slens, dtype=np.int64, count=len(slens))
+        min_len = int(np.partition(lens, idx)[idx])
+    else:
+        min_len = sorted(slens)[idx]
 
-    return list(sequences)
+    # drop all the sequences too short and cut the too large ones
+    # keeping the original order
+    return [
+        seq if l == min_len else seq[:min_len] for seq, l in zip(sequences, slens) if l >= min_len
+    ]
 
 
 def reinterpret(iterable, ifmt, ofmt):
@@ -420,6 +587,10 @@ def reinterpret(iterable, ifmt, ofmt):
         is a iterable of bytes. But iterating the Bytes object yields integers, no bytes
         hence the error.
 
+        >>> list(reinterpret([5], ifmt='>4s', ofmt='>I'))
+        Traceback <...>
+        struct.error: argument for 's' must be a bytes object
+
         A refined (but still incorrect) solution would be:
 
         >>> [hex(n) for n in reinterpret([data], ifmt='>8s', ofmt='>2I')]
@@ -447,6 +618,20 @@ def reinterpret(iterable, ifmt, ofmt):
         Bytes object) but instead we passed blocks of 4 bytes.
         In that way, it doesn't matter if data is 8, 16 or N bytes, nblocks() returns
         a list of elements of 4 bytes each so ifmt and ofmt don't need to be adjusted.
+
+        The conversions between bytes and unsigned integers like this one are
+        quite common and they have a faster implementation, transparent to
+        the caller:
+
+        >>> list(reinterpret([0xAABBCCDD], ifmt='<I', ofmt='<4s'))
+        [b'\xdd\xcc\xbb\xaa']
+
+        >>> list(reinterpret([b'AB'], ifmt='>4s', ofmt='>I'))
+        [1094844416]
+
+        >>> list(reinterpret([1 << 32], ifmt='>I', ofmt='>4s'))
+        Traceback <...>
+        struct.error: 'I' format requires 0 <= number <= 4294967295
         '''
 
     isize = struct.calcsize(ifmt)
@@ -457,11 +642,45 @@ def reinterpret(iterable, ifmt, ofmt):
                              ifmt, isize,
                              ofmt, osize))
 
+    fast = _reinterpret_fast_paths.get((ifmt, ofmt))
+    if fast is not None:
+        yield from fast(iterable)
+        return
+
     for i in iterable:
         for o in struct.unpack(ofmt, struct.pack(ifmt, i)):
             yield o
 
 
+def _reinterpret_bytes_as_int(fmt, byteorder):
+    size = struct.calcsize(fmt)
+
+    def reinterpret_fast(iterable):
+        for i in iterable:
+            # struct pads or truncates the bytes to the exact size
+            # and fails for non-bytes objects: keep the same semantics
+            if not isinstance(i, bytes) or len(i) != size:
+                i = struct.pack(fmt, i)
+            yield int.from_bytes(i, byteorder)
+
+    return reinterpret_fast
+
+
+def _reinterpret_int_as_bytes(fmt, byteorder):
+    size = struct.calcsize(fmt)
+
+    def reinterpret_fast(iterable):
+        for i in iterable:
+            try:
+                yield i.to_bytes(size, byteorder)
+            except (AttributeError, OverflowError):
+                # let struct to complain with its own error (or handle
+                # the int-like objects that it supports)
+                yield struct.pack(fmt, i)
+
+    return reinterpret_fast
+
+
 def repack(iterable, ifmt, ofmt):
     ''' Deprecated, use reinterpret() function instead. '''
     return reinterpret(iterable, ifmt, ofmt)
@@ -482,9 +701,57 @@ B.join = join_bytestrings
 # Push all the imports to the bottom of the file so anyone wanting to import
 # and use as_bytes and others can do it without cycling imports
 # This is true for imports of as_bytes by *ByteString and their dependencies.
-import base64, base58, bisect, struct, itertools
+import base64, binascii, functools, heapq, struct, itertools
+
+# prefer the native (Rust) base 58 decoder if it is installed
+try:
+    from based58 import b58decode
+except ImportError:
+    from base58 import b58decode
+
+# prefer the SIMD accelerated base 64 decoder if it is installed
+# (see _b64decode)
+try:
+    from pybase64 import b64decode as _fast_b64decode
+except ImportError:
+    _fast_b64decode = None
+
 from cryptonita.bytestrings import MutableByteString, ImmutableByteString
 
-from cryptonita.deps import importdep
+from cryptonita.deps import importdep, isinstalled
 
 np = importdep('numpy')
+
+# Decoders used by as_bytes() indexed by encoding.
+_decoders = {
+    'upper': _academic_decoder('upper'),
+    'lower': _academic_decoder('lower'),
+    # unhexlify accepts lower and upper case and it validates the
+    # input by itself so it is faster than b16decode
+    16: _base_decoder(binascii.unhexlify),
+    32: _base_decoder(base64.b32decode),
+    58: _base_decoder(b58decode),
+    # b64decode already discards any non-base 64 byte (like spaces
+    # and newlines) so we don't need to strip them. This saves two
+    # full copies of the input which it is noticeable for large blobs
+    64: _b64decode,
+    85: _base_decoder(base64.b85decode),
+}
+
+
+@functools.lru_cache(maxsize=1024)
+def _decode_cached(raw, encoding):
+    if isinstance(raw, str):
+        raw = raw.encode('ascii', errors='strict')
+    return ImmutableByteString(_decoders[encoding](raw))
+
+
+# Specialized versions of reinterpret() for the common
+# bytes <-> unsigned integer conversions: int.from_bytes/int.to_bytes
+# avoid the pack/unpack of struct per element.
+_reinterpret_fast_paths = {}
+for _order, _byteorder in (('>', 'big'), ('!', 'big'), ('<', 'little')):
+    for _sfmt, _ifmt in (('2s', 'H'), ('4s', 'I'), ('8s', 'Q')):
+        _sfmt, _ifmt = _order + _sfmt, _order + _ifmt
+        _reinterpret_fast_paths[(_sfmt, _ifmt)] = _reinterpret_bytes_as_int(_sfmt, _byteorder)
+        _reinterpret_fast_paths[(_ifmt, _sfmt)] = _reinterpret_int_as_bytes(_ifmt, _byteorder)
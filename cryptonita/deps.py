@@ -17,3 +17,10 @@ def importdep(name):
         return importlib.import_module(name)
     except ImportError:
         return _deps_null_module(name)
+
+
+def isinstalled(module):
+    ''' Return True if the <module> returned by importdep() is the real
+        module and not a placeholder of a missing dependency.
+        '''
+    return not isinstance(module, _deps_null_module)
@@ -4,6 +4,16 @@ import collections.abc
 import itertools
 import functools
 from operator import itemgetter, mul as mul_func
+
+try:
+    from math import prod
+except ImportError:  # Python < 3.8
+    def prod(iterable):
+        return functools.reduce(mul_func, iterable, 1)
+
+from cryptonita.deps import importdep, isinstalled
+
+np = importdep('numpy')
 '''
 >>> # Convenient definitions
 >>> from cryptonita import B           # byexample: +timeout=10
@@ -122,13 +132,25 @@ class FuzzySet(dict, collections.abc.Set):
             ('a', 'b')
 
             '''
-        nlargest = heapq.nlargest(
-            1 if n == None else n, self.items(), key=itemgetter(1)
-        )
         if n == None:
-            return nlargest[0][0]
+            return max(self, key=self.get)
         else:
-            return tuple(zip(*nlargest))[0]
+            return tuple(self._nlargest_keys(n))
+
+    def _nlargest_keys(self, n):
+        ''' Return the keys of the <n> most likely elements, from
+            the most likely to the least.
+
+            Ties are resolved in favor of the first key seen.
+            '''
+        if n >= len(self) // 2:
+            # selecting a large part of the set: a full sort is cheaper
+            # than a partial heap
+            return sorted(self, key=self.get, reverse=True)[:n]
+
+        # pick the keys only: do not build (key, prob) tuples for all
+        # the elements just to discard most of them
+        return heapq.nlargest(n, self, key=self.get)
 
     def __setitem__(self, elem, prob):
         r'''Add an element to the set and assign it a value of <prob>.
@@ -200,8 +222,11 @@ class FuzzySet(dict, collections.abc.Set):
 
         self.cut_off(self._min_membership)
 
-    def __getitem__(self, elem):
-        return dict.get(self, elem, 0)
+    def __missing__(self, elem):
+        # the membership of any element not in the set is 0;
+        # the lookup of the elements that are in the set is left
+        # to the (faster) dict.__getitem__
+        return 0
 
     def cut_off(self, n):
         r'''If <n> is an integer, drop all the elements except
@@ -226,13 +251,13 @@ class FuzzySet(dict, collections.abc.Set):
         '''
 
         if isinstance(n, int):
-            nlargest = heapq.nlargest(n, self.items(), key=itemgetter(1))
+            nlargest = [(k, self.get(k)) for k in self._nlargest_keys(n)]
             self.clear()
             dict.update(self, nlargest)
 
         else:
-            for k in list(self.keys()):
-                if self[k] < n:
+            for k, pr in list(self.items()):
+                if pr < n:
                     del self[k]
 
     def scale(self, n):
@@ -244,9 +269,38 @@ class FuzzySet(dict, collections.abc.Set):
             >>> g.scale(0.5)
             >>> g
             {'c' -> 0.4000, 'd' -> 0.2000, 'b' -> 0.2000, 'a' -> 0.2000}
+
+            The elements that end up below the minimum membership
+            are dropped:
+
+            >>> g = FuzzySet(['a', 'b'], [0.9, 0.3], min_membership=0.2)
+            >>> g.scale(0.5)
+            >>> g
+            {'a' -> 0.4500}
         '''
-        for k in self:
-            self[k] *= n
+        if 0 < n <= 1 and self.min_membership == 0:
+            # shrinking keeps all the memberships between 0 and 1
+            # and nothing can go below a minimum of 0: no checks needed
+            if len(self) >= 1024 and isinstalled(np):
+                keys, probs = self.as_arrays()
+                probs *= n
+                dict.update(self, zip(keys, probs.tolist()))
+            else:
+                dict.update(self, [(k, pr * n) for k, pr in self.items()])
+            return
+
+        updates = [(k, pr * n) for k, pr in self.items()]
+        for k, pr in updates:
+            self._check_probability(k, pr)
+
+        min_membership = self.min_membership
+        self.clear()
+        dict.update(
+            self, (
+                (k, pr)
+                for k, pr in updates if pr >= min_membership and pr != 0
+            )
+        )
 
     def normalize(self):
         r'''Makes the sum of all the elements to be 1.
@@ -256,10 +310,25 @@ class FuzzySet(dict, collections.abc.Set):
             >>> g
             {'c' -> 0.4000, 'd' -> 0.2000, 'b' -> 0.2000, 'a' -> 0.2000}
         '''
-        s = sum(pr for pr in self.values())
+        s = sum(self.values())
         if s > 0:
             self.scale(1.0 / s)
 
+    def as_arrays(self):
+        r'''Return the elements and their memberships as two parallel
+            sequences: a tuple of the elements and a numpy array of
+            the memberships.
+
+            >>> g = FuzzySet(['a', 'b', 'c'], [0.4, 0.2, 0.8])
+            >>> g.as_arrays()
+            (('a', 'b', 'c'), array([0.4, 0.2, 0.8]))
+
+            The array is a copy: modifying it does not change the set.
+        '''
+        return tuple(self.keys()), np.fromiter(
+            self.values(), dtype=np.float64, count=len(self)
+        )
+
     def update(self, other):
         r'''Perform the union of this set and the <other> and update self
             with the union.
@@ -291,14 +360,12 @@ class FuzzySet(dict, collections.abc.Set):
 
         '''
 
-        tmp = FuzzySet()
         min_set = other if len(other) < len(self) else self
         max_set = other if min_set is self else self
 
-        for k, pr in min_set.items():
-            tmp[k] = min(max_set[k], pr)
-
-        return tmp
+        # the constructor drops the elements with a membership of 0
+        get = max_set.get
+        return FuzzySet({k: min(get(k, 0), pr) for k, pr in min_set.items()})
 
     def union(self, other):
         r'''Return a fuzzy sets with elements of both
@@ -317,11 +384,15 @@ class FuzzySet(dict, collections.abc.Set):
         max_set = other if len(other) > len(self) else self
         min_set = other if max_set is self else self
 
-        tmp = FuzzySet(max_set)
+        # merge on a plain dict and build the fuzzy set once at the end:
+        # the constructor checks and filters all the memberships at once
+        tmp = dict(max_set)
+        get = tmp.get
         for k, pr in min_set.items():
-            tmp[k] = max(tmp[k], pr)
+            if pr > get(k, 0):
+                tmp[k] = pr
 
-        return tmp
+        return FuzzySet(tmp)
 
     def issubset(self, other):
         r'''Return True if self is a subset of the fuzzy set <other>.
@@ -348,8 +419,9 @@ class FuzzySet(dict, collections.abc.Set):
             True
 
         '''
+        get = other.get
         for k, pr in self.items():
-            if pr > other[k]:
+            if pr > get(k, 0):
                 return False
 
         return True
@@ -435,22 +507,25 @@ def join_fuzzy_sets(iterable, cut_off, j):
     if cut_off >= 1:
         counters = [len(fs) for fs in iterable]
 
-        vals = [
-            [(pr, idx) for pr in fs.values()]
-            for idx, fs in enumerate(iterable)
-        ]
-        vals = sorted(sum(vals, []))
+        vals = sorted(
+            (pr, idx) for idx, fs in enumerate(iterable) for pr in fs.values()
+        )
 
+        # keep the product of the counters up to date instead of
+        # recomputing it each time a single counter changes
+        total = prod(counters)
         for _, idx in vals:
-            if counters[idx] == 1:
+            old = counters[idx]
+            if old == 1:
                 continue  # skip it, at least 1 key of each fuzzy set must survive
 
-            counters[idx] -= 1
-
-            if functools.reduce(mul_func, counters) <= cut_off:
-                counters[idx] += 1
+            new = old - 1
+            if total // old * new <= cut_off:
                 break
 
+            counters[idx] = new
+            total = total // old * new
+
         sets = []
         for fs, counter in zip(iterable, counters):
             fs = fs.copy()
@@ -461,29 +536,87 @@ def join_fuzzy_sets(iterable, cut_off, j):
         upper_set.cut_off(cut_off)
         return upper_set
 
-    all_possibilities = itertools.product(*(fs.items() for fs in iterable))
+    # for large joins, compute the probabilities with numpy; for huge
+    # joins even the pruned partial products may not fit in memory so
+    # stream them
+    if isinstalled(np) and \
+            1024 <= len_join_fuzzy_sets(iterable) <= _MAX_LEN_JOIN_NP:
+        return _join_fuzzy_sets_np(iterable, cut_off, j)
+
+    # walk the keys and the memberships of all the combinations in
+    # parallel (both products yield them in the same order): the
+    # membership of each combination is the product of its pieces'
+    keys = itertools.product(*(fs.keys() for fs in iterable))
+    probs = map(
+        prod, itertools.product(*(fs.values() for fs in iterable))
+    )
 
-    def xxx(elems):
-        byte_seq, probs = zip(*elems)
+    # filter out the less likely and join the remain byte sequences
+    tmp = ((j.join(seq), pr) for seq, pr in zip(keys, probs) if pr >= cut_off)
 
-        seq_prob = 1
-        for p in probs:
-            seq_prob *= p
+    # build up the fuzzy set
+    return FuzzySet(dict(tmp))
 
-        return byte_seq, seq_prob
 
-    # calculate the probability for each sequence
-    tmp = (xxx(elems) for elems in all_possibilities)
+_MAX_LEN_JOIN_NP = 2**20
 
-    # filter out the less likely and join the remain byte sequences
-    tmp = ((j.join(byte_seq), pr) for byte_seq, pr in tmp if pr >= cut_off)
 
-    # build up the fuzzy set
+def _join_fuzzy_sets_np(iterable, cut_off, j):
+    ''' Like join_fuzzy_sets with a minimum probability <cut_off>
+        but computing the probabilities with numpy, one fuzzy set at
+        a time: the partial combinations are multiplied (outer product)
+        by the memberships of the next set and those that cannot reach
+        <cut_off> anymore are dropped before going to the next set.
+
+        The combinations are kept in the same order than
+        itertools.product so the result is the same:
+
+        >>> A = FuzzySet(dict(y=0.9, a=0.6))
+        >>> B = FuzzySet(dict(j=0.7, e=0.6))
+        >>> C = FuzzySet(dict(s=0.4))
+
+        >>> from cryptonita.fuzzy_set import _join_fuzzy_sets_np
+        >>> _join_fuzzy_sets_np([A, B, C], cut_off=0.2, j='')
+        {'yjs' -> 0.2520, 'yes' -> 0.2160}
+        '''
+    keys = [list(fs.keys()) for fs in iterable]
+    values = [
+        np.fromiter(fs.values(), dtype=np.float64, count=len(fs))
+        for fs in iterable
+    ]
+
+    # the largest membership that the remaining fuzzy sets can
+    # contribute to a partial combination
+    bounds = [1.0]
+    for vals in reversed(values[1:]):
+        bounds.append(bounds[-1] * vals.max())
+    bounds.reverse()
+
+    # but be a little generous with the bounds of all except the last
+    # set (its filter must be exact) so no combination is dropped by
+    # a rounding error
+    bounds = [b * (1 + 1e-9) for b in bounds[:-1]] + [1.0]
+
+    # the partial probabilities and, for each fuzzy set seen so far,
+    # the index of the key used by each partial combination
+    probs = np.ones(1)
+    survivors = []
+    for vals, bound in zip(values, bounds):
+        probs = np.multiply.outer(probs, vals)
+        rows, cols = np.nonzero(probs * bound >= cut_off)
+        probs = probs[rows, cols]
+        survivors = [idxs[rows] for idxs in survivors] + [cols]
+
+    columns = [
+        [ks[i] for i in idxs.tolist()] for ks, idxs in zip(keys, survivors)
+    ]
+
+    tmp = zip(
+        (j.join(pieces) for pieces in zip(*columns)),
+        probs.tolist()
+    )
     return FuzzySet(dict(tmp))
 
 
 def len_join_fuzzy_sets(iterable):
-    x = 1
-    for k in iterable:
-        x *= len(k)
-    return x
+    return prod(map(len, iterable))
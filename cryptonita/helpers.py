@@ -1,9 +1,16 @@
-import collections
-import collections.abc
 '''
 >>> from cryptonita.helpers import bisect_left_rev, bisect_right_rev
 '''
 
+import bisect
+from operator import neg
+
+# Some results computed from a whole byte string (its frequencies, ...)
+# are memoized in caches keyed by the string itself. Only strings up to
+# this length are cached so the caches don't pin large ciphertexts for
+# the life of the process.
+_MAX_CACHED_LEN = 4096
+
 
 def are_same_length_or_fail(a, b):
     if len(a) != len(b):
@@ -12,12 +19,24 @@ def are_same_length_or_fail(a, b):
 
 
 def are_bytes_or_fail(val, name):
-    if not isinstance(val, collections.abc.ByteString):
+    # check the concrete types: collections.abc.ByteString is much slower
+    # and it is deprecated since Python 3.12
+    if not isinstance(val, (bytes, bytearray)):
         raise TypeError("The parameter '%s' should be a bytes-like instance but it is %s." % \
                             (name, type(val)))
 
 
 def indices_from_slice_or_index(idx, l, step_must_be_one):
+    if type(idx) is int:
+        # fast path for the most common case, a plain integer: this
+        # is what slice(idx, idx + 1).indices(l) would return
+        # but without building the slice
+        start = idx + l if idx < 0 else idx
+        stop = start + 1
+        start = 0 if start < 0 else l if start > l else start
+        stop = 0 if stop < 0 else l if stop > l else stop
+        return start, stop, 1
+
     if isinstance(idx, slice):
         start, stop, step = idx.indices(l)
         if step != 1 and step_must_be_one:
@@ -52,6 +71,15 @@ def _bisect_chk(a, lo, hi):
     return lo, hi
 
 
+# the key parameter was added in Python 3.10: with key=neg the
+# search over a decreasing sequence is done by the C bisect
+try:
+    bisect.bisect_left([], 0, key=neg)
+    _bisect_has_key = True
+except TypeError:
+    _bisect_has_key = False
+
+
 def bisect_right_rev(a, x, lo=0, hi=None):
     ''' Return the index where to insert item x in list a, assuming a is sorted
         in decreasing order. (for increasing order see bisect.bisect_left)
@@ -74,6 +102,13 @@ def bisect_right_rev(a, x, lo=0, hi=None):
         '''
 
     lo, hi = _bisect_chk(a, lo, hi)
+    if _bisect_has_key:
+        # a sorted in decreasing order is -a sorted in increasing order
+        try:
+            return bisect.bisect_right(a, -x, lo, hi, key=neg)
+        except TypeError:
+            pass  # not numbers, do it by hand
+
     while lo < hi:
         mid = (lo + hi) // 2
         if x > a[mid]: hi = mid
@@ -103,6 +138,12 @@ def bisect_left_rev(a, x, lo=0, hi=None):
         '''
 
     lo, hi = _bisect_chk(a, lo, hi)
+    if _bisect_has_key:
+        try:
+            return bisect.bisect_left(a, -x, lo, hi, key=neg)
+        except TypeError:
+            pass
+
     while lo < hi:
         mid = (lo + hi) // 2
         if x >= a[mid]: hi = mid
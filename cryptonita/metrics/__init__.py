@@ -3,7 +3,13 @@
 >>> from cryptonita.metrics import *
 '''
 
+import collections
+
 from cryptonita.helpers import are_same_length_or_fail
+from cryptonita.deps import importdep, isinstalled
+from cryptonita.mixins import _bit_count
+
+np = importdep('numpy')
 
 
 def count_coincidences(seq1, seq2=None, aligned=False):
@@ -62,6 +68,16 @@ def count_coincidences(seq1, seq2=None, aligned=False):
         <...>
         ValueError: Counting the coincidences of a sequence with itself and keep it aligned will always generate the same count, the length of the sequence.
 
+        Trivial inputs are resolved without counting any symbol: there
+        are no coincidences with an empty sequence and a sequence
+        aligned with itself coincides in all its positions.
+
+        >>> count_coincidences(seq1, B(b''))
+        0
+
+        >>> count_coincidences(seq2, seq2, aligned=True)
+        5
+
         References:
         [1] https://eldipa.github.io/book-of-gehn/articles/2019/10/04/Index-of-Coincidence.html
     '''
@@ -71,26 +87,157 @@ def count_coincidences(seq1, seq2=None, aligned=False):
             raise ValueError(
                 "Counting the coincidences of a sequence with itself and keep it aligned will always generate the same count, the length of the sequence."
             )
+        elif _are_numpy_bytes(seq1):
+            f1 = _byte_histogram(seq1)
+            return int(f1.dot(f1) - len(seq1))
         else:
-            f1 = seq1.freq()
-            f2 = f1
-            offset = 1
+            # Sum for each symbol { cnt * (cnt - 1) }: only the counts
+            # are needed, not the symbols
+            counts = _counts_of(seq1)
+            if isinstalled(np) and isinstance(counts, np.ndarray):
+                c = counts.astype(np.int64)
+                return int(c.dot(c) - c.sum())
+            if len(counts) >= 1024 and isinstalled(np):
+                c = np.fromiter(counts, dtype=np.int64, count=len(counts))
+                return int(c.dot(c) - c.sum())
+            return sum(cnt * (cnt - 1) for cnt in counts)
     else:
+        if len(seq1) == 0 or len(seq2) == 0:
+            return 0
+
+        if aligned and seq1 is seq2:
+            return len(seq1)
+
+        if not aligned and _are_short_bytes(seq1, seq2):
+            return _count_coincidences_short(seq1, seq2)
+
+        if _are_numpy_bytes(seq1, seq2):
+            if aligned:
+                n = min(len(seq1), len(seq2))
+                a = np.frombuffer(seq1, dtype=np.uint8, count=n)
+                b = np.frombuffer(seq2, dtype=np.uint8, count=n)
+                return int(np.count_nonzero(a == b))
+            else:
+                return int(_byte_histogram(seq1).dot(_byte_histogram(seq2)))
+
         if aligned:
+            if isinstance(seq1, (bytes, bytearray)) and \
+                    isinstance(seq2, (bytes, bytearray)):
+                return _count_equal_bytes(seq1, seq2)
             return sum(a == b for a, b in zip(seq1, seq2))
         else:
-            f1 = seq1.freq()
-            f2 = seq2.freq()
-            offset = 0
+            f1 = _freq_of(seq1)
+            f2 = _freq_of(seq2)
 
     count = 0
     smaller, other = (f1, f2) if len(f1) < len(f2) else (f2, f1)
     for symbol, cnt in smaller.items():
-        count += (cnt - offset) * other.get(symbol, 0)
+        count += cnt * other.get(symbol, 0)
 
     return count
 
 
+def _are_numpy_bytes(*seqs):
+    ''' Return True if all the <seqs> are byte strings and numpy
+        is installed so we can count their bytes with numpy.
+        '''
+    return isinstalled(np) and all(
+        isinstance(s, (bytes, bytearray)) for s in seqs
+    )
+
+
+def _counts_of(seq):
+    ''' Return how many times each distinct item is in <seq>: sequences
+        with a _counts method (like the ngrams of a byte string) may
+        count them without building the items.
+        '''
+    counts = getattr(seq, '_counts', None)
+    if counts is not None:
+        return counts()
+    return _freq_of(seq).values()
+
+
+def _freq_of(seq):
+    ''' Return the frequencies of the items of <seq>: plain bytes and
+        bytearrays have no freq() method so their bytes are counted
+        here (as they are with numpy, see _are_numpy_bytes).
+
+        >>> from cryptonita.metrics import _freq_of
+        >>> _freq_of(b'ABA')
+        Counter({65: 2, 66: 1})
+        '''
+    freq = getattr(seq, 'freq', None)
+    if freq is not None:
+        return freq()
+    return collections.Counter(seq)
+
+
+def _byte_histogram(seq):
+    ''' Count how many times each of the 256 possible bytes is in <seq>.
+        This is like seq.freq() but with all the counts in a numpy array.
+        '''
+    return np.bincount(np.frombuffer(seq, dtype=np.uint8), minlength=256)
+
+
+def _are_short_bytes(seq1, seq2):
+    ''' Return True if <seq1> and <seq2> are byte strings short enough
+        to make the numpy call overhead of _byte_histogram larger than
+        counting the bytes one by one.
+        '''
+    return len(seq1) + len(seq2) <= 64 and \
+            isinstance(seq1, (bytes, bytearray)) and \
+            isinstance(seq2, (bytes, bytearray))
+
+
+def _count_coincidences_short(seq1, seq2):
+    ''' Count the unaligned coincidences between two short byte strings
+        counting only the bytes that are in both with bytes.count
+        (no histograms nor Counters are built).
+
+        >>> from cryptonita.metrics import _count_coincidences_short
+        >>> _count_coincidences_short(b'AABC', b'EACAB')
+        6
+        '''
+    cnt1, cnt2 = seq1.count, seq2.count
+    return sum(
+        cnt1(symbol) * cnt2(symbol)
+        for symbol in set(seq1).intersection(seq2)
+    )
+
+
+def _count_equal_bytes(seq1, seq2):
+    ''' Count in how many positions <seq1> and <seq2> have the same
+        byte (up to the shorter of both) without numpy.
+
+        The sequences are xored as (big) integers so the equal bytes
+        become zero bytes and then those are counted with a SWAR
+        trick: all the bytes are processed at once by the C
+        implementation of the integers.
+
+        >>> from cryptonita.metrics import _count_equal_bytes
+        >>> _count_equal_bytes(b'AABC', b'EACAB')
+        1
+        '''
+    n = min(len(seq1), len(seq2))
+    if n == 0:
+        return 0
+
+    # slicing a byte string copies it (and wraps it if it is not
+    # a plain bytes); a memoryview slice does not
+    with memoryview(seq1) as mv1, memoryview(seq2) as mv2:
+        x = int.from_bytes(mv1[:n], 'big') ^ int.from_bytes(mv2[:n], 'big')
+
+    # for each byte, set its high bit if any of its bits is set:
+    # adding 0x7f to the lower 7 bits sets the high bit if any of those
+    # bits is set (and it never carries to the next byte); or-ing x
+    # takes into account the high bit of the byte itself.
+    low7 = int.from_bytes(b'\x7f' * n, 'big')
+    nonzero = ((x & low7) + low7) | x
+
+    # the high bits that remain clear are the zero bytes (equal bytes)
+    return n - _bit_count(nonzero & ~low7)
+
+
 def icoincidences(seq1, seq2=None, expected=None):
     r'''
         Take the sequence <seq1> that can be:
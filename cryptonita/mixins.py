@@ -1,5 +1,15 @@
 from cryptonita.helpers import are_same_length_or_fail, are_bytes_or_fail
-import base64, base58
+from cryptonita.deps import importdep, isinstalled
+import base64, base58, hmac, functools
+
+# prefer the SIMD accelerated base 64 encoder if it is installed
+try:
+    from pybase64 import b64encode
+except ImportError:
+    from base64 import b64encode
+
+np = importdep('numpy')
+_fastloops = importdep('cryptonita._fastloops')
 '''
 >>> # Convenient definitions
 >>> from cryptonita import B           # byexample: +timeout=10
@@ -98,7 +108,32 @@ class SequenceMixin:
             return new
 
     def copy(self):
-        return type(self)(super().copy())  # TODO, double copy?
+        ''' Return a copy of the byte string.
+
+                >>> a = B(b'ABC')
+                >>> a.copy()
+                'ABC'
+
+                >>> b = B(b'ABC', mutable=True)
+                >>> c = b.copy()
+                >>> c[0] = b'X'
+                >>> b, c
+                ('ABC', 'XBC')
+
+            An immutable byte string cannot change so, like
+            copy.copy() does with bytes, it is returned as is:
+
+                >>> a.copy() is a
+                True
+            '''
+        return self._copy_if_mutable()
+
+    def _copy_if_mutable(self):
+        if isinstance(self, bytes):
+            return self
+
+        # building the byte string from self copies it once
+        return type(self)(self)
 
     def __xor__(self, other):
         r'''
@@ -136,15 +171,78 @@ class SequenceMixin:
                 (b'0B3637272A2B2E63622C2E69692A23693A2A3C6324202D623D63343C2A26226324272765272A'
                  b'282B2F20430A652E2C652A3124333A653E2B2027630C692B20283165286326302E27282F')
 
+            A key of a single byte (very common when breaking a xor
+            cipher) is applied translating each byte with a table
+            so it is fast for any length:
+
+                >>> (plaintext ^ B('5').inf())[:8]
+                'w@G[\\[R\x15'
+
+            Long byte strings are xored with numpy (if installed) instead
+            of byte by byte, with the same result:
+
+                >>> long_text = plaintext * 4
+                >>> (long_text ^ key.inf())[:len(plaintext)] == plaintext ^ key.inf()
+                True
+
         '''
         if not isinstance(other, InfiniteStream):
             are_same_length_or_fail(self, other)
+        elif len(other.base) == 1 and \
+                isinstance(other.base, (bytes, bytearray)):
+            return self.xor_single(other.base[0])
+        else:
+            other = _as_finite_key(other, len(self))
+
+        if len(self) >= 256 and isinstalled(np):
+            b = _as_xor_operand_np(other)
+            if b is not None:
+                a = np.frombuffer(self, dtype=np.uint8)
+                if len(self) < 64 * 1024:
+                    return type(self)(np.bitwise_xor(a, b).tobytes())
+
+                # for large strings avoid the intermediate copies: xor
+                # directly into the result if it is mutable or build it
+                # from the numpy buffer without tobytes() otherwise
+                if isinstance(self, bytearray):
+                    res = type(self)(len(self))
+                    np.bitwise_xor(a, b, out=np.frombuffer(res, dtype=np.uint8))
+                    return res
+                return type(self)(np.bitwise_xor(a, b))
+
+        if _is_byte_buffer(other):
+            return type(self)(_xor_as_int(self, other))
 
         return type(self)((a ^ b for a, b in zip(self, other)))
 
     def __rxor__(self, other):
         return self ^ other
 
+    def xor_single(self, k):
+        r''' Xor each byte of the string with the single byte <k>
+            (an integer).
+
+                >>> B('ABC').xor_single(1)
+                '@CB'
+
+            This is the same than xoring with B(k).inf() but each byte
+            is translated with a precomputed table (see bytes.translate)
+            which makes it the fastest way to try all the 256 keys of a
+            single byte xor cipher.
+            '''
+        return type(self)(super().translate(_xor_table(k)))
+
+    def xor_repeating(self, key):
+        r''' Xor the string with the <key> repeated as many times as
+            needed (a repeating-key xor, or Vigenere-like cipher).
+
+                >>> B('ABCD').xor_repeating(b'\x01\x02')
+                '@@BF'
+
+            This is the same than xoring with B(key).inf().
+            '''
+        return self ^ InfiniteStream(key)
+
     def __ixor__(self, other):
         raise TypeError("You cannot modify a immutable byte string.")
 
@@ -168,6 +266,10 @@ class SequenceMixin:
                 >>> a + b'123'
                 'ABC123'
 
+                >>> m = B(b'AB', mutable=True) + b'C'
+                >>> m, isinstance(m, MutableByteString)
+                ('ABC', True)
+
             The concatenation cannot be inplace (the string cannot be
             expended):
 
@@ -176,10 +278,22 @@ class SequenceMixin:
                 TypeError: You cannot expand an byte string.
             '''
 
-        return type(self)(super().__add__(other))  # TODO double copy?
+        if isinstance(self, bytearray) and isinstance(other, (bytes, bytearray)):
+            # copy self once and append <other> in place instead of
+            # concatenating both and copying the result again
+            res = type(self)(self)
+            res.extend(other)
+            return res
+
+        # a bytes subclass cannot adopt the concatenated bytes: the
+        # result is copied once more
+        return type(self)(super().__add__(other))
 
     def __radd__(self, other):
-        return type(self)(other) + self  # TODO double copy?
+        if isinstance(other, (bytes, bytearray)):
+            # join the raw buffers and wrap the result once
+            return type(self)(b''.join((other, self)))
+        return type(self)(other) + self
 
     def __iadd__(self, other):
         raise TypeError("You cannot expand an byte string.")
@@ -212,11 +326,23 @@ class SequenceMixin:
                 >>> a *= 2
                 Traceback <...>
                 TypeError: You cannot expand an byte string.
+
+            Mutable strings are repeated too:
+
+                >>> B(b'ABC', mutable=True) * 2
+                'ABCABC'
             '''
-        return type(self)(super().__mul__(other))  # TODO double copy?
+        if isinstance(self, bytearray):
+            # copy self once and repeat it in place (the __imul__ of
+            # bytearray, not ours) instead of copying the repetition
+            res = type(self)(self)
+            super(SequenceMixin, res).__imul__(other)
+            return res
+
+        return type(self)(super().__mul__(other))
 
     def __rmul__(self, other):
-        return type(self)(super().__mul__(other))  # TODO double copy?
+        return self * other
 
     def __imul__(self, other):
         raise TypeError("You cannot expand an byte string.")
@@ -226,7 +352,8 @@ class SequenceMixin:
             bytes to the left.
 
             This does not increase or shrink the string length
-            and returns a copy always.
+            and returns a copy always (except for an immutable
+            string shifted by nothing, which is returned as is).
 
                 >>> s = B("ABCD")
 
@@ -244,19 +371,25 @@ class SequenceMixin:
                 >>> s << B('EFGHIJK')
                 'HIJK'
 
+                >>> s << b'WXYZ'
+                'WXYZ'
+
             *Beware:* each push or shift involves copying all the byte
-            string which can be really slow.
+            string which can be really slow. The remaining bytes of
+            self and <other> are joined from their buffers so there is
+            no intermediate byte string but the result is still a copy.
 
         '''
         n = len(other)
 
         if n == 0:
-            return type(self)(self)
+            return self._copy_if_mutable()
 
         if n > len(self):
             return type(self)(other[-len(self):])
         else:
-            return self[n:] + other
+            # join the raw buffers and wrap the result once
+            return type(self)(b''.join((memoryview(self)[n:], other)))
 
     def __ilshift__(self, other):
         raise TypeError("You cannot modify a immutable byte string.")
@@ -284,10 +417,12 @@ class SequenceMixin:
                 True
             '''
 
-        if base == 58:
-            return base58.b58encode(self)
+        encoder = _encoders.get(base)
+        if encoder is None:
+            # unknown base, let base64 fail with its own error
+            encoder = getattr(base64, 'b%iencode' % base)
 
-        return getattr(base64, 'b%iencode' % base)(self)
+        return encoder(self)
 
     def pad(self, n, scheme):
         r'''Pad the byte string up to <n> bytes-boundaries using
@@ -338,23 +473,35 @@ class SequenceMixin:
                 b'AAAAAAAA'
                 b'AAAAAAAAA'
 
+            The 'pkcs#7' padding is at most 255 bytes long:
+
+                >>> B('A').pad(300, 'pkcs#7')
+                Traceback <...>
+                ValueError: Padding of 299 bytes is too large for 'pkcs#7'
+
         '''
         if scheme == 'pkcs#7':
             assert n > 0
             npad = n - (len(self) % n)
             assert 1 <= npad <= n
 
-            padding = type(self)([npad]) * npad
+            if npad > len(_pkcs7_pads):
+                raise ValueError(
+                    "Padding of %i bytes is too large for 'pkcs#7'" % npad
+                )
+            padding = _pkcs7_pads[npad - 1]
 
         elif scheme == 'zeros':
             assert n > 0
             npad = n - (len(self) % n)
             assert 1 <= npad <= n
 
-            padding = type(self)([0]) * npad
+            padding = bytes(npad)
         else:
             raise ValueError("Unknow padding scheme '%s'" % scheme)
 
+        # the padding is a plain bytes object: only the result is
+        # wrapped as a byte string (see __add__)
         return self + padding
 
     def unpad(self, scheme):
@@ -363,11 +510,41 @@ class SequenceMixin:
                 >>> padded.unpad('pkcs#7')
                 'AAAAAAAAAAAA'
 
+                >>> B('AAAAAAAAAAAA\x04\x04\x03\x04').unpad('pkcs#7')
+                Traceback <...>
+                ValueError: Bad padding 'pkcs#7' with last byte 0x4
+
+                >>> B('AAAAAAAAAAAA\x00').unpad('pkcs#7')
+                Traceback <...>
+                ValueError: Bad padding 'pkcs#7' with last byte 0x0
+
+            The padding is checked in constant time (it does not stop
+            at the first wrong byte) to not leak where the padding is
+            wrong (see padding oracle attacks).
+
+            Mutable strings are unpadded too and they are left untouched:
+
+                >>> m = B('AAAA\x02\x02', mutable=True)
+                >>> m.unpad('pkcs#7')
+                'AAAA'
+
+                >>> m
+                'AAAA\x02\x02'
         '''
         if scheme == 'pkcs#7':
             n = self[-1]
 
-            if n > 64 or self[-n:] != type(self)([n]) * n:
+            # check all the conditions and compare all the bytes
+            # of the padding before failing, without short-circuits;
+            # for n == 0 the expected padding is the last one of the
+            # table, never equal to memoryview(self)[-0:] (all the string)
+            bad_len = (n == 0) | (n > 64) | (n > len(self))
+
+            # compare the padding in place, without copying it; the view
+            # is released right away so a mutable string can be resized
+            with memoryview(self) as mv:
+                good_pad = hmac.compare_digest(mv[-n:], _pkcs7_pads[n - 1])
+            if bad_len | (not good_pad):
                 raise ValueError(
                     "Bad padding '%s' with last byte %#x" % (scheme, n)
                 )
@@ -506,13 +683,46 @@ class MutableSequenceMixin(SequenceMixin):
                 >>> s
                 'AB'
 
+                >>> s ^= memoryview(b'\x03\x03')
+                >>> s
+                'BA'
+
+                >>> s ^= [3, 3]
+                >>> s
+                'AB'
+
             See SequenceMixin.__xor__ for more about this.
         '''
         if not isinstance(other, InfiniteStream):
             are_same_length_or_fail(self, other)
+        else:
+            other = _as_finite_key(other, len(self))
+
+        if isinstalled(_fastloops) and _is_byte_buffer(other):
+            # the compiled loop xors the buffers in place, without
+            # any intermediate copy
+            if isinstance(other, memoryview):
+                other = other.cast('B')
+            _fastloops.ixor_bytes(self, other, len(self))
+            return self
+
+        if len(self) >= 16 and isinstalled(np):
+            b = _as_xor_operand_np(other)
+            if b is not None:
+                # a bytearray is writable so numpy can xor it in place
+                a = np.frombuffer(self, dtype=np.uint8)
+                np.bitwise_xor(a, b, out=a)
+                return self
 
-        for idx in range(len(self)):
-            super().__setitem__(idx, super().__getitem__(idx) ^ other[idx])
+        if _is_byte_buffer(other):
+            super().__setitem__(slice(None), _xor_as_int(self, other))
+            return self
+
+        # any other sequence of integers: xor them in one pass and
+        # set all the bytes at once (bytes() fails like setting a byte
+        # would if a result is not in range(256))
+        xored = bytes(a ^ other[idx] for idx, a in enumerate(self))
+        super().__setitem__(slice(None), xored)
 
         return self
 
@@ -539,18 +749,101 @@ class MutableSequenceMixin(SequenceMixin):
         if n > len(self):
             self[:] = other[-len(self):]
         else:
-            self[:-n] = self[n:]
+            # move the bytes within the same buffer (a memmove): no
+            # intermediate copy of self[n:] is made
+            with memoryview(self) as mv:
+                mv[:-n] = mv[n:]
             self[-n:] = other
 
         return self
 
 
+@functools.lru_cache(maxsize=None)
+def _bit_count_table_np():
+    ''' Return a numpy array with the count of bits set of each byte. '''
+    return np.frombuffer(_bit_count_table, dtype=np.uint8)
+
+
+@functools.lru_cache(maxsize=256)
+def _xor_table(k):
+    ''' Return the translation table (see bytes.translate) that xors
+        each byte with <k>.
+        '''
+    return bytes(b ^ k for b in range(256))
+
+
+def _xor_as_int(a, b):
+    ''' Xor two byte strings of the same length seen as (big) integers
+        and return the result as bytes.
+
+        The xor of all the bytes is a single operation done by the
+        C implementation of the integers.
+
+        >>> from cryptonita.mixins import _xor_as_int
+        >>> _xor_as_int(b'\x01\x02\xff', b'\x01\x03\x0f')
+        b'\x00\x01\xf0'
+        '''
+    x = int.from_bytes(a, 'big') ^ int.from_bytes(b, 'big')
+    return x.to_bytes(len(a), 'big')
+
+
+def _is_byte_buffer(obj):
+    ''' Return True if <obj> exposes its bytes as a plain buffer
+        (bytes, bytearray or a contiguous memoryview of bytes) so it can be
+        xored as a whole instead of byte by byte.
+        '''
+    return isinstance(obj, (bytes, bytearray)) or \
+            (isinstance(obj, memoryview) and obj.itemsize == 1 and obj.contiguous)
+
+
+def _as_finite_key(stream, n):
+    ''' Return the first <n> bytes of the infinite <stream> as bytes
+        if its base is a byte string, otherwise return the <stream>
+        untouched.
+
+        The base is repeated by bytes' multiplication and sliced,
+        both in C, instead of iterating the stream byte by byte.
+
+        >>> from cryptonita.mixins import _as_finite_key
+        >>> _as_finite_key(B('ICE').inf(), 7)
+        b'ICEICEI'
+        '''
+    base = stream.base
+    if not isinstance(base, (bytes, bytearray)) or not base:
+        return stream
+
+    base = bytes(base)
+    return (base * -(-n // len(base)))[:n]
+
+
+def _as_xor_operand_np(other):
+    ''' Return <other> as a numpy array of uint8 or None if <other>
+        is not a byte string.
+        '''
+    if _is_byte_buffer(other):
+        return np.frombuffer(other, dtype=np.uint8)
+
+    return None
+
+
 class ByteStatsMixin:
     __slots__ = ()
 
-    # TODO cache me
     def count_1s(self):
-        return sum(_number_of_1s_in_byte[b] for b in self)
+        ''' Count how many bits are set in the byte string.
+
+            >>> B(b'\x01\x03\xff').count_1s()
+            11
+
+            The string is seen as a (big) integer so the bits are
+            counted by the C implementation of the integers.
+
+            Unlike the frequencies, the count is not cached: it is a
+            single pass done in C and a cache keyed by the string would
+            help only to repeated calls on the same string while keeping
+            those strings alive.
+            '''
+        return _bytes_bit_count(self)
 
     def hamming_distance(self, m2):
         r'''
@@ -571,17 +864,109 @@ class ByteStatsMixin:
             <...>
             ValueError: Mismatch lengths. Left string has 14 bytes but right string has 28.
 
+            Both strings are seen as (big) integers so the xor and the
+            count of bits are done by the C implementation of the
+            integers, even for a plain memoryview:
+
+            >>> m1.hamming_distance(memoryview(b'wokka wokka!!!'))
+            37
+
+            The same goes for an infinite key, repeated to the length of
+            the string:
+
+            >>> m1.hamming_distance(B('wokka ').inf())
+            36
+
         '''
+        if isinstance(m2, InfiniteStream):
+            m2 = _as_finite_key(m2, len(self))
+        else:
+            are_same_length_or_fail(self, m2)
+
+        if _is_byte_buffer(m2) and (len(self) < 4096 or not isinstalled(np)):
+            # xor and count in one go over the strings seen as (big)
+            # integers, without building the xored byte string
+            x = int.from_bytes(self, 'big') ^ int.from_bytes(m2, 'big')
+            return _bit_count(x)
+
+        # longer strings are xored faster with numpy (see __xor__); the
+        # xored string is temporal so its count is not cached
+        return _bytes_bit_count(self ^ m2)
+
+    def batch_hamming(self, candidates):
+        r'''
+            Return the Hamming distance between self and each of the
+            <candidates>, like calling hamming_distance for each one.
+
+            >>> m1 = B('this is a test')
+            >>> m1.batch_hamming([B('wokka wokka!!!'), m1, b'this is a tesT'])
+            [37, 0, 1]
+
+            All the candidates must have the same length than self:
+
+            >>> m1.batch_hamming([B('wokka wokka!!!'), B('wokka')])
+            Traceback (most recent call last):
+            <...>
+            ValueError: Mismatch lengths. Left string has 14 bytes but right string has 5.
+
+            With numpy installed, all the candidates are xored with
+            self and their bits are counted at once. That requires all
+            of them to be byte strings; other sequences are compared
+            one by one, whatever the count of candidates is:
+
+            >>> B('AB').batch_hamming([[65, 66], [64, 66]] * 5)
+            [0, 1, 0, 1, 0, 1, 0, 1, 0, 1]
+        '''
+        candidates = list(candidates)
+        n = len(self)
+        if not all(len(c) == n for c in candidates):
+            for c in candidates:
+                are_same_length_or_fail(self, c)
+
+        if len(candidates) < 8 or not isinstalled(np) or \
+                not all(_is_byte_buffer(c) for c in candidates):
+            return [self.hamming_distance(c) for c in candidates]
 
-        x = self ^ m2
-        return x.count_1s()
+        rows = np.frombuffer(b''.join(candidates), dtype=np.uint8)
+        rows = rows.reshape(len(candidates), len(self))
 
+        # count the bits set of each xored byte with a lookup table
+        x = rows ^ np.frombuffer(self, dtype=np.uint8)
+        bits = np.take(_bit_count_table_np(), x)
+        return bits.sum(axis=1, dtype=np.int64).tolist()
 
-_number_of_1s_in_byte = [0] * 256
-for i in range(len(_number_of_1s_in_byte)):
-    _number_of_1s_in_byte[i] = (i & 1) + _number_of_1s_in_byte[i >> 1]
 
-_number_of_1s_in_byte = tuple(_number_of_1s_in_byte)
+# the 'pkcs#7' paddings of 1 to 255 bytes: the i-th one is i+1 bytes
+# of value i+1
+_pkcs7_pads = tuple(bytes((i, )) * i for i in range(1, 256))
+
+_encoders = {
+    16: base64.b16encode,
+    32: base64.b32encode,
+    58: base58.b58encode,
+    64: b64encode,
+    85: base64.b85encode,
+}
+
+# the count of bits set of each byte: a lookup table for
+# bytes.translate and for numpy (see _bit_count_table_np)
+_bit_count_table = bytes(bin(b).count('1') for b in range(256))
+
+try:
+    _bit_count = int.bit_count
+
+    def _bytes_bit_count(raw):
+        return _bit_count(int.from_bytes(raw, 'big'))
+
+except AttributeError:  # Python < 3.10
+
+    def _bytes_bit_count(raw):
+        # translate each byte to its count of bits and add them up:
+        # both done in C and much faster than bin(n) for large numbers
+        return sum(raw.translate(_bit_count_table))
+
+    def _bit_count(n):
+        return _bytes_bit_count(n.to_bytes((n.bit_length() + 7) // 8, 'big'))
 
 import collections
 import itertools as itools
@@ -595,13 +980,40 @@ class SequenceStatsMixin(cryptonita.plots.SequencePlotMixin):
     def freq(self):
         return collections.Counter(self)
 
+    def _freq(self):
+        ''' Like freq() but the returned Counter may be shared (cached):
+            it must not be modified. Sequences that cache their
+            frequencies override this to skip the copy that freq()
+            does.
+            '''
+        return self.freq()
+
+    def _counts(self):
+        ''' Return how many times each distinct item is in the sequence,
+            in no particular order. Sequences that can count their items
+            without building them override this.
+            '''
+        return self._freq().values()
+
     def most_common(self, n):
-        elems, _ = zip(*self.freq().most_common(n))
+        r''' Return the <n> most common items, from the most common
+            to the least. Items with the same count are returned in
+            order of first appearance.
+
+                >>> B('ABBCCCAC').most_common(2)
+                (67, 65)
+
+                >>> B('ABBCCCAC').nblocks(2).most_common(2)
+                ('AB', 'BC')
+            '''
+        elems, _ = zip(*self._freq().most_common(n))
         return elems
 
     def entropy(self, qk=None, base=None):
-        freq = list(self.freq().values())
-        return entropy(freq, qk, base)
+        counts = self._counts()
+        if not (isinstalled(np) and isinstance(counts, np.ndarray)):
+            counts = list(counts)
+        return entropy(counts, qk, base)
 
     def iduplicates(self, distance, idx_of='second'):
         r'''Return the index of each duplicates or repeated item.
@@ -640,9 +1052,26 @@ class SequenceStatsMixin(cryptonita.plots.SequencePlotMixin):
                 >>> list(blocks.iduplicates(distance=5, idx_of='both'))
                 [0, 6, 2, 8]
 
+            Long sequences that can be seen as a 2d array of bytes (one
+            row per item, see _as_rows_np) are compared with numpy,
+            with the same results:
+
+                >>> blocks = (B('AABBAACCCCDDAADDAA') * 16).nblocks(2)
+                >>> list(blocks.iduplicates(distance=5))[:2]
+                [6, 8]
+
         '''
         assert idx_of in ('both', 'first', 'second')
 
+        equal = self._duplicates_np(distance) if len(self) >= 256 else None
+        if equal is not None:
+            for idx in np.flatnonzero(equal).tolist():
+                if idx_of in ('first', 'both'):
+                    yield idx
+                if idx_of in ('second', 'both'):
+                    yield idx + distance + 1
+            return
+
         # consecutive items if distance is 0
         # 1 item between if distance is 1, ...
         left, right = itools.tee(self)
@@ -662,7 +1091,63 @@ class SequenceStatsMixin(cryptonita.plots.SequencePlotMixin):
             idx += 1
 
     def has_duplicates(self, distance):
+        ''' Return True if there is at least one duplicate at the given
+            <distance> (see iduplicates).
+
+                >>> from cryptonita import B
+                >>> blocks = B('AABBCCCCDD').nblocks(2)
+                >>> blocks.has_duplicates(distance=0)
+                True
+                >>> blocks.has_duplicates(distance=1)
+                False
+
+                >>> blocks = (B('AABBCCDD') * 64).nblocks(2)
+                >>> blocks.has_duplicates(distance=0)
+                False
+                >>> blocks.has_duplicates(distance=3)
+                True
+            '''
+        equal = self._duplicates_np(distance) if len(self) >= 256 else None
+        if equal is not None:
+            return bool(equal.any())
         return next(self.iduplicates(distance), None) != None
 
+    def count_duplicates(self, distance):
+        ''' Count how many duplicates are at the given <distance>
+            (see iduplicates).
+
+                >>> from cryptonita import B
+                >>> B('AABBAACCCCDDAADDAA').nblocks(2).count_duplicates(distance=1)
+                3
+
+                >>> (B('AABBCCDD') * 64).nblocks(2).count_duplicates(distance=3)
+                252
+            '''
+        equal = self._duplicates_np(distance) if len(self) >= 256 else None
+        if equal is not None:
+            return int(np.count_nonzero(equal))
+        return sum(1 for _ in self.iduplicates(distance))
+
+    def _as_rows_np(self):
+        ''' Return the items as the rows of a 2d numpy array of bytes
+            or None if that is not possible (the default).
+            '''
+        return None
+
+    def _duplicates_np(self, distance):
+        ''' Return a boolean numpy array with True at the index of the
+            first item of each duplicate (see iduplicates) comparing all
+            the items at once with numpy or None if the items cannot be
+            seen as rows of bytes.
+            '''
+        rows = self._as_rows_np()
+        if rows is None:
+            return None
+
+        # a row is equal to the row <distance> + 1 after if all
+        # its bytes are equal
+        step = distance + 1
+        return (rows[:-step] == rows[step:]).all(axis=1)
+
 
 from cryptonita.views import InfiniteStream, NgramsView, NblocksView
@@ -1,4 +1,5 @@
 from cryptonita.deps import importdep
+import math
 
 np = importdep('numpy')
 gp = importdep('gmpy2')
@@ -23,21 +24,60 @@ def inv_matrix(A, m):
         array([[1, 0, 0],
                [0, 1, 0],
                [0, 0, 1]])
+
+        The inverse is computed with a Gauss-Jordan elimination
+        module m using only integers so there is no rounding of
+        floats involved. A column may not have an invertible number
+        (module m) but the matrix still be invertible:
+
+        >>> inv_matrix([[2, 1], [13, 1]], m=26)
+        array([[ 7, 19],
+               [13, 14]])
+
+        If the matrix has no inverse, fail:
+
+        >>> inv_matrix([[2, 1], [4, 2]], m=26)
+        Traceback <...>
+        ZeroDivisionError: invert() no inverse exists
         '''
+    n = len(A)
 
-    det_A = np.linalg.det(A)
-    inv_A = np.linalg.inv(A)
+    # the augmented matrix [A | I] module m (of Python integers even
+    # if A is a numpy array so they never overflow)
+    M = []
+    for i, row in enumerate(A):
+        row = [int(a) % m for a in row] + [0] * n
+        row[n + i] = 1
+        M.append(row)
 
-    # Adjugate matrix of A
-    # https://en.wikipedia.org/wiki/Adjugate_matrix
-    adj_A = det_A * inv_A
+    for col in range(n):
+        # take as pivot the first row with an invertible number in
+        # the column, if any
+        for r in range(col, n):
+            if math.gcd(M[r][col], m) == 1:
+                M[col], M[r] = M[r], M[col]
+                break
+        else:
+            # reduce the column below the pivot with the Euclid's
+            # algorithm so the pivot ends being the gcd of the column:
+            # a combination of the rows may be invertible
+            piv = M[col]
+            for r in range(col + 1, n):
+                row = M[r]
+                while row[col]:
+                    q = piv[col] // row[col]
+                    piv, row = row, [(p - q * x) % m for p, x in zip(piv, row)]
+                M[r] = row
+            M[col] = piv
 
-    tmp = np.round(det_A)
-    #np.isclose(det_A, tmp)
-    det_A = int(tmp)
+        # raise ZeroDivisionError if the pivot (hence A) is not invertible
+        piv = M[col]
+        inv = int(gp.invert(piv[col], m))
+        piv = M[col] = [(x * inv) % m for x in piv]
 
-    inv_det_A = int(gp.invert(det_A, m))
+        for r in range(n):
+            k = M[r][col]
+            if r != col and k:
+                M[r] = [(x - k * p) % m for x, p in zip(M[r], piv)]
 
-    inv_A = adj_A * inv_det_A
-    inv_A = np.round(inv_A)
-    return inv_A.astype(int) % m
+    return np.array([row[n:] for row in M], dtype=int)
@@ -19,6 +19,7 @@ def axes_style_decorator(*style_args, **style_kargs):
     def decorator(func):
         @functools.wraps(func)
         def wrapped(*args, **kargs):
+            _, _, _, sns = import_plot_libs()
             with sns.axes_style(*style_args, **style_kargs):
                 return func(*args, **kargs)
 
@@ -55,7 +56,7 @@ class SequencePlotMixin:
 
         fig, ax = plt.subplots()
 
-        elems, freqs = zip(*s.freq().most_common(n))
+        elems, freqs = zip(*s._freq().most_common(n))
 
         # prune
         ileft = 0 if fmax is None else bisect_left_rev(freqs, fmax)
@@ -69,22 +70,18 @@ class SequencePlotMixin:
             e.fhex(8) for e in elems
         ]
 
-        # percentiles
+        # percentiles: the first element whose cumulative count
+        # is greater than each percentile
         fsums = np.cumsum(freqs)
         ftotal = fsums[-1]
-        percentiles = [p * ftotal for p in [.05, .25, .5, .75, .95]]
-        yticks = []
-        ylabels = []
-        for ix, f in enumerate(fsums):
-            if f > percentiles[0]:
-                while percentiles and f > percentiles[0]:
-                    p = percentiles[0]
-                    del percentiles[0]
-                yticks.append(ix)
-                ylabels.append(round(p / ftotal, 2))
-
-                if not percentiles:
-                    break
+        percentiles = np.array([.05, .25, .5, .75, .95])
+        ixs = np.searchsorted(fsums, percentiles * ftotal, side='right')
+
+        # if several percentiles fall in the same element, label it
+        # with the largest
+        last = np.append(ixs[1:] != ixs[:-1], True)
+        yticks = ixs[last].tolist()
+        ylabels = percentiles[last].round(2).tolist()
 
         ax.set_yticks(yticks)
         ax.set_yticklabels(ylabels)
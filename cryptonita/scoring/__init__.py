@@ -25,9 +25,12 @@ def scoring(msg, space, score_func, min_score=0.5, **score_func_params):
     are_bytes_or_fail(msg, 'msg')
 
     params = score_func_params
-    lengths = FuzzySet(
-        ((x, score_func(msg, x, **params)) for x in space),
-        pr='tuple',
-        min_membership=min_score
-    )
+    if score_func is key_length_by_hamming_distance and not params:
+        # score all the lengths in a batch
+        space = list(space)
+        scores = zip(space, key_lengths_by_hamming_distance(msg, space))
+    else:
+        scores = ((x, score_func(msg, x, **params)) for x in space)
+
+    lengths = FuzzySet(scores, pr='tuple', min_membership=min_score)
     return lengths
@@ -3,15 +3,16 @@ import math
 import itertools
 from collections import Counter
 
-from cryptonita.deps import importdep
+from cryptonita.deps import importdep, isinstalled
 
 np = importdep('numpy')
-stats = importdep('scipy.stats')
 detect_langs = importdep('language.detect_langs')
 
 from cryptonita import B
 from cryptonita.helpers import are_bytes_or_fail, are_same_length_or_fail
-from cryptonita.metrics import icoincidences
+from cryptonita.metrics import icoincidences, _are_numpy_bytes
+from cryptonita.mixins import _bit_count_table_np
+from cryptonita.stats import entropy, _load_scipy_stats
 '''
 >>> # Convenient definitions
 >>> from cryptonita import B           # byexample: +timeout=10
@@ -110,7 +111,7 @@ def fit_freq_score(m, expected_prob, return_p=False, significance=0.05):
     ehist, bins = np.histogram(x, weights=efreq, bins=bins)
     ohist, _ = np.histogram(x, weights=ofreq, bins=bins)
 
-    _, p = stats.chisquare(ohist, ehist)
+    _, p = _load_scipy_stats().chisquare(ohist, ehist)
 
     return p if return_p else (0 if p <= significance else 0.5)
 
@@ -170,6 +171,16 @@ def ngram_entropy_score(m, N=1):
         It is quite useful to distinguish short random sequences from not-much
         random sequences.
 
+        For long strings the ngrams are counted with numpy, without
+        building them, with the same result:
+
+        >>> from cryptonita.stats import entropy
+        >>> long_random = truly_random * 16
+        >>> ngram_entropy_score(long_random, N=2)
+        4.852<...>
+        >>> entropy(list(long_random.ngrams(2).freq().values()))
+        4.852<...>
+
         It is related with icoincidences, but in the practice, entropy
         is slower and it is less discriminant.
 
@@ -181,10 +192,29 @@ def ngram_entropy_score(m, N=1):
         logarithm (base e).
 
     '''
-    return m.ngrams(N).entropy()
+    return _entropy(m.ngrams(N)._counts())
+
+
+def _entropy(counts):
+    ''' Compute the entropy (base e) of the distribution given by the
+        <counts> of each symbol directly with numpy, without the
+        argument checking and dispatching of scipy.stats.entropy.
 
+        >>> from cryptonita.scoring.score_funcs import _entropy
+        >>> _entropy([3, 5, 2])
+        1.0296530140645<...>
+        '''
+    if not isinstalled(np):
+        return entropy(list(counts))
+
+    if not isinstance(counts, np.ndarray):
+        counts = list(counts)
+    p = np.asarray(counts, dtype=np.float64)
+    p /= p.sum()
+    return float(-(p * np.log(p)).sum())
 
-def yes_no_score(m, yes_prob=0.5):
+
+def yes_no_score(m, yes_prob=0.5, exact=False):
     r'''
         Count how many 1s (yes or successes) the <m> strings has (a byte
         string that it will be seing like a string of bits).
@@ -218,6 +248,33 @@ def yes_no_score(m, yes_prob=0.5):
         >>> yes_no_score(no_random, yes_prob=0.5)
         1.0
 
+        The p-value is approximated with a normal distribution (with
+        continuity correction), good enough for the thousands of bits
+        of a typical byte string. For short strings or for a <yes_prob>
+        close to 0 or 1, the exact binomial test can be done with
+        scipy:
+
+        >>> yes_no_score(truly_random, yes_prob=0.5, exact=True)
+        0.488<...>
+
+        If <yes_prob> is 0 or 1 the count of 1s is certain under the
+        hypothesis: any other count rejects it for sure (the p-value
+        is 0) and the expected count does not reject it at all (the
+        p-value is 1), like the exact test:
+
+        >>> yes_no_score(B(b'\xff' * 10), yes_prob=1.0)
+        0.0
+        >>> yes_no_score(B(b'\xfe' * 10), yes_prob=1.0)
+        1.0
+        >>> yes_no_score(B(b'\x01' * 10), yes_prob=0.0)
+        1.0
+
+        An empty string has no bits: there is no evidence to reject
+        the hypothesis.
+
+        >>> yes_no_score(B(b''), yes_prob=0.5)
+        0.0
+
         [The p-value] "does not tell us what we want to know,
         and we so much want to know what we want to know that,
         out of desperation, we nevertheless believe that it does"
@@ -232,7 +289,21 @@ def yes_no_score(m, yes_prob=0.5):
     sucessess = m.count_1s()
     bits = len(m) * 8
 
-    return 1 - stats.binom_test(sucessess, n=bits)
+    if bits == 0:
+        return 0.0
+
+    if exact:
+        stats = _load_scipy_stats()
+        return 1 - stats.binomtest(sucessess, n=bits, p=yes_prob).pvalue
+
+    # two-sided p-value of the normal approximation of the binomial
+    mean = bits * yes_prob
+    std = math.sqrt(bits * yes_prob * (1 - yes_prob))
+    if std == 0:
+        return 0.0 if sucessess == mean else 1.0
+
+    z = max(abs(sucessess - mean) - 0.5, 0) / std
+    return 1 - math.erfc(z / math.sqrt(2))
 
 
 def ic_score(m, m2):
@@ -302,19 +373,65 @@ def key_length_by_hamming_distance(ciphertext, length):
     # Keep the maximum difference
     max_distance = 0
     cblocks = ciphertext.nblocks(l)
-    for a, b in zip(cblocks[:-1], cblocks[1:]):
-        if len(b) < l:
-            # this may happen if the original ciphertext has a total length
-            # not divisible by l, so the last block will have less bytes
-            # In that case we discard it
-            break
 
-        max_distance = max(a.hamming_distance(b), max_distance)
+    if len(cblocks) >= 8 and _are_numpy_bytes(ciphertext):
+        arr = np.frombuffer(ciphertext, dtype=np.uint8)
+        max_distance = _max_blocks_distance_np(arr, l)
+    else:
+        for a, b in zip(cblocks[:-1], cblocks[1:]):
+            if len(b) < l:
+                # this may happen if the original ciphertext has a total
+                # length not divisible by l, so the last block will have
+                # less bytes. In that case we discard it
+                break
+
+            max_distance = max(a.hamming_distance(b), max_distance)
 
     # Compute the score normalizing the distance
     return 1 - (max_distance / (l * 8))
 
 
+def key_lengths_by_hamming_distance(ciphertext, lengths):
+    ''' Score each of the <lengths> like key_length_by_hamming_distance
+        does and return the scores in the same order.
+
+        >>> ciphertext = B('ICE').inf()[:64] ^ B(b'a quiet plaintext, repeated. ' * 3)[:64]
+        >>> key_lengths_by_hamming_distance(ciphertext, [3, 4]) == \
+        ...     [key_length_by_hamming_distance(ciphertext, l) for l in (3, 4)]
+        True
+
+        With numpy, the ciphertext is seen as an array once and the
+        blocks of each length are compared all at once.
+        '''
+    if not _are_numpy_bytes(ciphertext):
+        return [key_length_by_hamming_distance(ciphertext, l) for l in lengths]
+
+    arr = np.frombuffer(ciphertext, dtype=np.uint8)
+    scores = []
+    for l in lengths:
+        if len(ciphertext) // l < 8:
+            # too short for numpy (or too short at all, let it fail)
+            scores.append(key_length_by_hamming_distance(ciphertext, l))
+        else:
+            scores.append(1 - (_max_blocks_distance_np(arr, l) / (l * 8)))
+
+    return scores
+
+
+def _max_blocks_distance_np(arr, l):
+    ''' Return the maximum Hamming distance between two consecutive
+        blocks of length <l> of the numpy array <arr> (of uint8).
+
+        The full blocks are seen as the rows of a matrix (no copy),
+        xored with the next row all at once and the bits of each xored
+        byte are counted with a lookup table.
+        '''
+    nfull = len(arr) // l
+    rows = arr[:nfull * l].reshape(nfull, l)
+    bits = np.take(_bit_count_table_np(), rows[:-1] ^ rows[1:])
+    return int(bits.sum(axis=1).max())
+
+
 def key_length_by_ic(ciphertext, length):
     ''' Score the possible <length> of the key that was used to encrypt
         and obtain the <ciphertext> using the Index of Coincidence (IC).
@@ -1,4 +1,7 @@
 import math
+import functools
+
+from cryptonita.deps import importdep, isinstalled
 
 
 def _py_entropy(pk, qk=None, base=None):
@@ -49,7 +52,25 @@ def _py_entropy(pk, qk=None, base=None):
         ) / np
 
 
-try:
-    from scipy.stats import entropy
-except ImportError:
-    entropy = _py_entropy
+def entropy(pk, qk=None, base=None):
+    ''' Compute the entropy of <pk> (or the Kullback-Leibler divergence
+        between <pk> and <qk>) like scipy.stats.entropy does.
+
+        scipy.stats is used if it is installed but it is imported on the
+        first call and not when cryptonita is imported: scipy.stats alone
+        takes most of the import time of cryptonita.
+
+        >>> from cryptonita.stats import entropy
+        >>> entropy([0.3, 0.5, 0.2])
+        1.0296530140645<...>
+        '''
+    stats = _load_scipy_stats()
+    if not isinstalled(stats):
+        return _py_entropy(pk, qk, base)
+    return stats.entropy(pk, qk, base)
+
+
+@functools.lru_cache(maxsize=None)
+def _load_scipy_stats():
+    ''' Import scipy.stats on the first use (see importdep). '''
+    return importdep('scipy.stats')
@@ -4,14 +4,20 @@
 '''
 
 from cryptonita.conv import B
-from bisect import bisect_left
+from cryptonita.bytestrings import ImmutableByteString
 
-from operator import itemgetter
+from operator import itemgetter, sub
 from collections import defaultdict
 import itertools
+import functools
 
 from collections import Counter
 
+from cryptonita.deps import importdep, isinstalled
+from cryptonita.helpers import _MAX_CACHED_LEN
+
+np = importdep('numpy')
+
 # References:
 # Automating the Cracking of Simple Ciphers, Matthew C. Berntsen
 
@@ -72,28 +78,86 @@ def as_ngram_repeated_positions(s, n, allow_overlapping=True):
         Again, NOT supported yet.
         '''
 
+    # the numpy version takes the bytes of <s> directly but the pure
+    # Python version needs a byte string (it calls s.ngrams()): accept
+    # the same inputs in both
+    if n <= 8 and len(s) >= 256 and isinstance(s, ImmutableByteString) \
+            and isinstalled(np):
+        return _as_ngram_repeated_positions_np(s, n)
+
     # Map each ngram to its own identifier and add to the pos_sorted list
     # the positions and ids in order.
     # During the scanning, count how many ngrams we see of each ngram type.
     #
     # Assuming a O(1) hash implementation, this is Time/Space O(n)
+    # The id of the ngram at each position is stored alone; the (pos, id)
+    # tuples are built only for the repeated ngrams.
+    #
+    # The ngrams are plain bytes slices: they are used only as keys and
+    # slicing and hashing bytes is done in C while ImmutableByteString
+    # does it in Python (see SequenceMixin.__getitem__ and its __hash__)
+    m = len(s.ngrams(n))  # this checks that s is long enough
+    raw = bytes(s)
+
     id_of_ngram = {0: 0}
-    pos_sorted = []
-    ngram_cnt_by_id = defaultdict(
-        int, [(0, 0)]
-    )  # id==0 is special with a count of 0 always
-    for pos, ngram in enumerate(s.ngrams(n)):
+    ids = []
+    ngram_cnt_by_id = [0]  # id==0 is special with a count of 0 always
+    for ngram in (raw[i:i + n] for i in range(m)):
         id = id_of_ngram.setdefault(ngram, len(id_of_ngram))
+        if id == len(ngram_cnt_by_id):
+            ngram_cnt_by_id.append(0)  # a new ngram
 
-        pos_sorted.append((pos, id))
-        ngram_cnt_by_id[
-            id] += 1  # because the ids goes from 1 to N we could use an array
+        ids.append(id)
+        ngram_cnt_by_id[id] += 1  # the ids go from 1 to N: use a list
 
     # Filter any unique ngram (count of 0)
     # This is Time/Space O(n)
-    pos_sorted = [(p, id) for p, id in pos_sorted if ngram_cnt_by_id[id] > 1]
+    return [(p, id) for p, id in enumerate(ids) if ngram_cnt_by_id[id] > 1]
+
+
+def _as_ngram_repeated_positions_np(s, n):
+    ''' Like as_ngram_repeated_positions but packing each ngram of
+        up to 8 bytes in an integer and grouping them with numpy.
+
+        The ngrams' ids are assigned in order of first appearance
+        so the result is the same:
+
+        >>> from cryptonita.stats.kasiski import _as_ngram_repeated_positions_np
+        >>> s = B(b'ABCDBCDABCDBC')
+        >>> _as_ngram_repeated_positions_np(s, n=3)
+        [(0, 1), (1, 2), (2, 3), (3, 4), (4, 2), (7, 1), (8, 2), (9, 3), (10, 4)]
+        '''
+    pos, ids = _repeated_positions_arrays(s, n)
+    return list(zip(pos.tolist(), ids.tolist()))
+
+
+def _repeated_positions_arrays(s, n):
+    ''' Like _as_ngram_repeated_positions_np but return the positions
+        and the ids as two numpy arrays.
+        '''
+    arr = np.frombuffer(s, dtype=np.uint8)
+    m = len(arr) - n + 1
+
+    # the ngram at position p is s[p:p+n] packed as a big endian integer
+    ngrams = np.zeros(m, dtype=np.uint64)
+    for k in range(n):
+        ngrams <<= np.uint64(8)
+        ngrams |= arr[k:k + m]
+
+    _, first_pos, inverse, counts = np.unique(
+        ngrams, return_index=True, return_inverse=True, return_counts=True
+    )
+
+    # np.unique sorts the ngrams by value: renumber them so the
+    # ids follow the order in which each ngram was seen first
+    ids_by_value = np.empty(len(first_pos), dtype=np.int64)
+    ids_by_value[np.argsort(first_pos)] = np.arange(1, len(first_pos) + 1)
+
+    # filter any unique ngram
+    positions = np.flatnonzero(counts[inverse] > 1)
+    ids = ids_by_value[inverse[positions]]
 
-    return pos_sorted
+    return positions, ids
 
 
 def merge_overlaping(pos_sorted):
@@ -174,37 +238,77 @@ def merge_overlaping(pos_sorted):
     # false negatives.
     #
     # This is a Time/Space O(n)
-    id_of_ngram = {0: 0}
-    ngram_cnt_by_id = defaultdict(int, [(0, 0)])
-    for ix, (cur, nex) in enumerate(zip(pos_sorted[:-1], pos_sorted[1:])):
-        pcur, id = cur
-        pnex, id2 = nex
-
-        if pcur + 1 != pnex:
-            pos_sorted[ix] = (0, 0)  # delete later (index 0 is special)
-        else:
+    if len(pos_sorted) >= 256 and isinstalled(np):
+        return _merge_overlaping_np(pos_sorted)
+
+    # A single pass over the consecutive pairs of positions building the
+    # list of the N+1 ngrams: the input is not modified and the positions
+    # that cannot be merged are simply not added.
+    id_of_ngram = {}
+    merged = []
+    pcur, id = pos_sorted[0]
+    for pnex, id2 in itertools.islice(pos_sorted, 1, None):
+        if pcur + 1 == pnex:
             # instead of building the ngram from G1 and G2 we use
             # G1's and G2's identifiers as a temporally ngram representation
             # to map the new larger ngram to an new identifier
             # Note how (id, id2) means that the ngram was built from G1 and G2
             # *in that order* (G2 and G1 gives another ngram of course so
             # the (id, id2) tuple order is important)
-            id = id_of_ngram.setdefault((id, id2), len(id_of_ngram))
+            new_id = id_of_ngram.setdefault((id, id2), len(id_of_ngram) + 1)
+            merged.append((pcur, new_id))
 
-            pos_sorted[ix] = (pcur, id)  # new ngram
-            ngram_cnt_by_id[id] += 1
+        pcur, id = pnex, id2
 
-    # the last position P1 always is deleted because there is
+    # the last position P1 is never merged because there is
     # not P2 such P1 + 1 == P2 *and* P1 < P2 (basically because there
     # are no more positions after P1)
-    pos_sorted[-1] = (0, 0)
 
-    # filter any position marked to be deleted (their index is 0)
-    # or if it is the position to a ngram that appears once.
+    # filter any position to a ngram that appears once.
     # Time/Space O(n)
-    pos_sorted = [(p, id) for p, id in pos_sorted if ngram_cnt_by_id[id] > 1]
+    ngram_cnt_by_id = Counter(map(itemgetter(1), merged))
+    return [(p, id) for p, id in merged if ngram_cnt_by_id[id] > 1]
+
+
+def _merge_overlaping_np(pos_sorted):
+    ''' Like merge_overlaping but finding the consecutive positions
+        and identifying the new (id, id2) ngrams with numpy.
+
+        Like in _as_ngram_repeated_positions_np, the new ids are assigned
+        in order of first appearance so the result is the same:
+
+        >>> from cryptonita.stats.kasiski import _merge_overlaping_np
+        >>> l3_positions = as_ngram_repeated_positions(B(b'ABCDBCDABCDBC'), n=3)
+        >>> _merge_overlaping_np(l3_positions)
+        [(0, 1), (1, 2), (2, 3), (7, 1), (8, 2), (9, 3)]
+        '''
+    pos_and_ids = np.array(pos_sorted, dtype=np.int64)
+    pos, ids = _merge_overlaping_arrays(pos_and_ids[:, 0], pos_and_ids[:, 1])
+    return list(zip(pos.tolist(), ids.tolist()))
+
+
+def _merge_overlaping_arrays(pos, ids):
+    ''' Like _merge_overlaping_np but taking and returning the positions
+        and the ids as two numpy arrays.
+        '''
+    # P1 and P2 can be merged if P1 + 1 == P2 (no need to build
+    # the shifted P1 + 1 array, the difference is enough)
+    mergeable = np.diff(pos) == 1
+    pos = pos[:-1][mergeable]
+
+    # the (id, id2) pair as a single integer
+    pairs = ids[:-1][mergeable] * (int(ids.max()) + 1) + ids[1:][mergeable]
+
+    _, first_pos, inverse, counts = np.unique(
+        pairs, return_index=True, return_inverse=True, return_counts=True
+    )
 
-    return pos_sorted
+    ids_by_value = np.empty(len(first_pos), dtype=np.int64)
+    ids_by_value[np.argsort(first_pos)] = np.arange(1, len(first_pos) + 1)
+
+    # filter any position of a ngram that appears once
+    repeated = counts[inverse] > 1
+    return pos[repeated], ids_by_value[inverse[repeated]]
 
 
 def deltas_from_positions(positions):
@@ -230,8 +334,9 @@ def deltas_from_positions(positions):
         [3, 3, 4]
 
     '''
-    # Time O(n)
-    return (y - x for x, y in zip(positions[:-1], positions[1:]))
+    # Time O(n): the subtraction of each position from the next
+    # one is done by map() and operator.sub, both in C
+    return map(sub, positions[1:], positions)
 
 
 def frequency_of_deltas(s, start=3, end=None):
@@ -259,33 +364,37 @@ def frequency_of_deltas(s, start=3, end=None):
 
         >>> frequency_of_deltas(s, start=4, end=6)
         [Counter({7: 3}), Counter({7: 2})]
+
+        The frequencies of a short immutable string are computed once
+        and cached; the caller receives a copy that can be modified
+        freely:
+
+        >>> freqs = frequency_of_deltas(s)
+        >>> freqs[0].clear()
+        >>> frequency_of_deltas(s)[0]
+        Counter({7: 3, 3: 1, 4: 1})
     '''
+    if isinstance(s, bytes) and len(s) <= _MAX_CACHED_LEN:
+        return [
+            c.copy() for c in _cached_frequency_of_deltas(s, start, end)
+        ]
+    return _frequency_of_deltas(s, start, end)
+
+
+def _frequency_of_deltas(s, start, end):
+    # like in as_ngram_repeated_positions, only byte strings go to numpy
+    if start <= 8 and len(s) >= 256 and \
+            isinstance(s, ImmutableByteString) and isinstalled(np):
+        return _frequency_of_deltas_np(s, start, end)
+
     res = []
     n = start
     pos_sorted = as_ngram_repeated_positions(s, n=n)
     while pos_sorted:
-        # we group the positions by id: each group of positions
-        # will have the same identifier and therefore will belong
-        # to the same ngram.
-        #
-        # The grouping preserves the order of the positions: positions
-        # of the same ngram will stay sorted.
-        #
-        # This makes the compute of deltas easier (see
-        # deltas_from_positions)
-        #
-        # O(n)
-        pos_grouped = defaultdict(list)
-        for pos, id in pos_sorted:
-            pos_grouped[id].append(pos)
-
-        # for each group (ngram) compute the differences between
-        # its positions or "gaps"
-        # This is O(n)
-        delta_stats = Counter()
-        for positions in pos_grouped.values():
-            d = deltas_from_positions(positions)
-            delta_stats.update(Counter(d))
+        if len(pos_sorted) >= 256 and isinstalled(np):
+            delta_stats = _count_deltas_np(pos_sorted)
+        else:
+            delta_stats = _count_deltas(pos_sorted)
 
         res.append(delta_stats)
 
@@ -297,6 +406,97 @@ def frequency_of_deltas(s, start=3, end=None):
     return res
 
 
+def _frequency_of_deltas_np(s, start, end):
+    ''' Like _frequency_of_deltas but keeping the positions and the ids
+        of the ngrams in numpy arrays from one ngram length to the next
+        instead of in lists of (position, id) tuples.
+
+        >>> from cryptonita.stats.kasiski import _frequency_of_deltas_np
+        >>> _frequency_of_deltas_np(B(b'ABCDBCDABCDBC'), 3, None)
+        [Counter({7: 3, 3: 1, 4: 1}), Counter({7: 3}), Counter({7: 2}), Counter({7: 1})]
+        '''
+    res = []
+    n = start
+    pos, ids = _repeated_positions_arrays(s, n)
+    while len(pos):
+        res.append(_count_deltas_arrays(pos, ids))
+
+        n += 1
+        if end is not None and n >= end:
+            break
+        pos, ids = _merge_overlaping_arrays(pos, ids)
+
+    return res
+
+
+_cached_frequency_of_deltas = functools.lru_cache(maxsize=128)(
+    _frequency_of_deltas
+)
+
+
+def _count_deltas(pos_sorted):
+    # we group the positions by id: each group of positions
+    # will have the same identifier and therefore will belong
+    # to the same ngram.
+    #
+    # The grouping preserves the order of the positions: positions
+    # of the same ngram will stay sorted.
+    #
+    # This makes the compute of deltas easier (see
+    # deltas_from_positions)
+    #
+    # O(n)
+    pos_grouped = defaultdict(list)
+    for pos, id in pos_sorted:
+        pos_grouped[id].append(pos)
+
+    # for each group (ngram) compute the differences between
+    # its positions or "gaps"
+    # This is O(n)
+    delta_stats = Counter()
+    for positions in pos_grouped.values():
+        delta_stats.update(deltas_from_positions(positions))
+
+    return delta_stats
+
+
+def _count_deltas_np(pos_sorted):
+    ''' Count the deltas between consecutive positions of the same
+        ngram like frequency_of_deltas does but with numpy.
+
+        The ids of the ngrams are in order of first appearance (see
+        as_ngram_repeated_positions and merge_overlaping) so grouping
+        the positions by id with a stable sort yields the same deltas
+        in the same order than the pure Python version.
+
+        >>> from cryptonita.stats.kasiski import _count_deltas_np
+        >>> pos_sorted = as_ngram_repeated_positions(B(b'ABCDBCDABCDBC'), n=3)
+        >>> _count_deltas_np(pos_sorted)
+        Counter({7: 3, 3: 1, 4: 1})
+        '''
+    pos_and_ids = np.array(pos_sorted, dtype=np.int64)
+    return _count_deltas_arrays(pos_and_ids[:, 0], pos_and_ids[:, 1])
+
+
+def _count_deltas_arrays(pos, ids):
+    ''' Like _count_deltas_np but taking the positions and the ids
+        as two numpy arrays.
+        '''
+    by_id = np.argsort(ids, kind='stable')
+    pos, ids = pos[by_id], ids[by_id]
+
+    # deltas between consecutive positions of the same ngram only
+    deltas = np.diff(pos)[ids[1:] == ids[:-1]]
+
+    # keep the order in which the deltas are seen first: Counter
+    # prints the deltas with the same count in that order
+    values, first_seen, counts = np.unique(
+        deltas, return_index=True, return_counts=True
+    )
+    order = np.argsort(first_seen)
+    return Counter(dict(zip(values[order].tolist(), counts[order].tolist())))
+
+
 def sort_deltas_by_probability(deltas_freqs):
     ''' Given a deltas frequencies of deltas of ngrams of different lengths,
         sort them by probability.
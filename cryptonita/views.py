@@ -5,8 +5,13 @@
 
 import math
 import itertools
+import collections
+import functools
 from cryptonita.helpers import indices_from_slice_or_index
 from cryptonita.conv import as_bytes
+from cryptonita.deps import importdep, isinstalled
+
+np = importdep('numpy')
 
 
 class InfiniteStream:
@@ -68,6 +73,23 @@ class InfiniteStream:
 from cryptonita.mixins import SequenceStatsMixin
 
 
+def _iter_slices(base, size, step, count):
+    ''' Iterate over <count> slices of <size> bytes of <base> taken
+        every <step> bytes, like base[i:i + size] does.
+
+        If <base> is immutable its buffer is sliced with a memoryview
+        (no copy) and each slice is copied once building the byte
+        string from the view; base[i:i + size] would copy it twice.
+        A mutable base is not viewed because a memoryview would lock
+        its size while the iterator is alive.
+        '''
+    if isinstance(base, bytes):
+        wrap, view = type(base), memoryview(base)
+        return (wrap(view[i:i + size]) for i in range(0, count * step, step))
+
+    return (base[i:i + size] for i in range(0, count * step, step))
+
+
 class NgramsView(SequenceStatsMixin):
     ''' N-grams view of a byte string.
 
@@ -107,6 +129,9 @@ class NgramsView(SequenceStatsMixin):
             >>> ngrams.entropy()
             1.0114042647073<...>
 
+            >>> list((B('ABC') * 128).ngrams(3).iduplicates(distance=2))[:3]
+            [3, 4, 5]
+
     '''
     __slots__ = ('base', 'n')
 
@@ -124,8 +149,7 @@ class NgramsView(SequenceStatsMixin):
         self.n = n
 
     def __iter__(self):
-        n = self.n
-        return (self.base[i:i + n] for i in range(len(self)))
+        return _iter_slices(self.base, self.n, 1, len(self))
 
     def __getitem__(self, idx):
         ''' Get a ngram or a range of ngrams
@@ -153,6 +177,37 @@ class NgramsView(SequenceStatsMixin):
     def __len__(self):
         return len(self.base) - self.n + 1
 
+    def freq(self):
+        # the Counter of a cached base is shared (see _freq): copy it
+        if _is_cached_base(self.base):
+            return _cached_ngrams_freq(self.base, self.n).copy()
+        return self._freq()
+
+    def _freq(self):
+        # the ngrams of an immutable base never change: count them once
+        if _is_cached_base(self.base):
+            return _cached_ngrams_freq(self.base, self.n)
+        if isinstance(self.base, bytes):
+            return _ngrams_freq(self.base, self.n)
+        return super().freq()
+
+    def _counts(self):
+        # entropy and the index of coincidence only need the counts:
+        # count the ngrams with numpy without building any of them
+        base, n = self.base, self.n
+        if isinstance(base, bytes) and n <= 8 and len(base) >= 1024 \
+                and isinstalled(np):
+            return _ngrams_counts_np(base, n)
+        return super()._counts()
+
+    def _as_rows_np(self):
+        # one row per ngram: the rows overlap in the same buffer, no
+        # byte is copied
+        if not isinstalled(np) or not isinstance(self.base, (bytes, bytearray)):
+            return None
+        arr = np.frombuffer(self.base, dtype=np.uint8)
+        return np.lib.stride_tricks.sliding_window_view(arr, self.n)
+
     def _base_slice_from_ngram_slice(self, idx):
         n = self.n
         start, stop, step = indices_from_slice_or_index(
@@ -164,6 +219,120 @@ class NgramsView(SequenceStatsMixin):
         return repr(list(self))
 
 
+# like the frequencies of the bytes (see helpers._MAX_CACHED_LEN) but
+# shorter: a Counter of bytes has at most 256 entries while a Counter
+# of ngrams may have one entry (a byte string object) per ngram
+_MAX_CACHED_NGRAMS_LEN = 1024
+
+
+def _is_cached_base(base):
+    return isinstance(base, bytes) and len(base) <= _MAX_CACHED_NGRAMS_LEN
+
+
+# typed: the ngrams have the type of their base so the counts of
+# B(b'AB') cannot be shared with the counts of b'AB'
+@functools.lru_cache(maxsize=256, typed=True)
+def _cached_ngrams_freq(base, n):
+    return _ngrams_freq(base, n)
+
+
+def _ngrams_freq(base, n):
+    ''' Count the ngrams of the immutable byte string <base>.
+
+        The ngrams are counted as plain bytes slices and only the
+        distinct ones are built with the type of <base> (as iterating
+        a NgramsView does). Building a byte string object per ngram
+        costs more than the bytes itself (it is an instance of a Python
+        class and it is tracked by the garbage collector) and most of
+        them would be discarded right away as duplicated keys.
+
+        >>> from cryptonita.views import _ngrams_freq
+        >>> _ngrams_freq(B('ABABABC'), 2)
+        Counter({'AB': 3, 'BA': 2, 'BC': 1})
+        '''
+    raw = bytes(base)
+    cnt = None
+    if n <= 8 and len(raw) >= 4096 and isinstalled(np):
+        cnt = _ngrams_freq_np(raw, n)
+
+    if cnt is None:
+        cnt = collections.Counter(
+            raw[i:i + n] for i in range(len(raw) - n + 1)
+        )
+
+    wrap = type(base)
+    if wrap is bytes:
+        return cnt
+    return collections.Counter({wrap(ngram): c for ngram, c in cnt.items()})
+
+
+def _ngrams_freq_np(raw, n):
+    ''' Count the ngrams of <raw> (plain bytes) with numpy, for ngrams
+        of up to 8 bytes.
+
+        Each ngram is packed in a 64 bits integer (big endian) from a
+        sliding window over the bytes and the integers are counted with
+        np.unique. Like Counter, the ngrams are added in order of first
+        appearance.
+
+        Return None if the ngrams are too diverse: building the Counter
+        with one entry per distinct ngram costs as much as counting them
+        in pure Python so numpy does not pay off.
+
+        >>> from cryptonita.views import _ngrams_freq_np
+        >>> _ngrams_freq_np(b'BAAB' * 1024, 2)
+        Counter({b'BA': 1024, b'AA': 1024, b'AB': 1024, b'BB': 1023})
+
+        >>> import os
+        >>> _ngrams_freq_np(os.urandom(4096), 3) is None
+        True
+        '''
+    keys = _pack_ngrams_np(raw, n)
+
+    # guess how diverse the ngrams are from the first ones
+    if len(np.unique(keys[:4096])) > 1024:
+        return None
+
+    uniq, counts = np.unique(keys, return_counts=True)
+    cnt = dict(
+        zip((k.to_bytes(n, 'big') for k in uniq.tolist()), counts.tolist())
+    )
+    return collections.Counter(
+        {ngram: cnt[ngram]
+         for ngram in sorted(cnt, key=raw.find)}
+    )
+
+
+def _pack_ngrams_np(raw, n):
+    ''' Pack each ngram of <n> bytes (up to 8) of <raw> in a 64 bits
+        integer (big endian) from a sliding window over the bytes.
+
+        >>> from cryptonita.views import _pack_ngrams_np
+        >>> _pack_ngrams_np(b'ABC', 2).tolist() == [0x4142, 0x4243]
+        True
+        '''
+    arr = np.frombuffer(raw, dtype=np.uint8)
+    m = len(arr) - n + 1
+
+    keys = arr[:m].astype(np.uint64)
+    for j in range(1, n):
+        keys <<= np.uint64(8)
+        keys |= arr[j:j + m]
+    return keys
+
+
+def _ngrams_counts_np(raw, n):
+    ''' Count how many times each distinct ngram of <raw> is in it
+        and return only the counts, in no particular order, as a
+        numpy array.
+
+        >>> from cryptonita.views import _ngrams_counts_np
+        >>> sorted(_ngrams_counts_np(b'ABABABC', 2).tolist())
+        [1, 2, 3]
+        '''
+    return np.unique(_pack_ngrams_np(raw, n), return_counts=True)[1]
+
+
 class NblocksView(SequenceStatsMixin):
     ''' N-blocks view of a byte string.
 
@@ -198,8 +367,7 @@ class NblocksView(SequenceStatsMixin):
         self.bz = block_size
 
     def __iter__(self):
-        bz = self.bz
-        return (self.base[i * bz:(i + 1) * bz] for i in range(len(self)))
+        return _iter_slices(self.base, self.bz, self.bz, len(self))
 
     def __getitem__(self, idx):
         ''' Get a particular block:
@@ -294,6 +462,15 @@ class NblocksView(SequenceStatsMixin):
 
         return self
 
+    def _as_rows_np(self):
+        # only the full blocks: a shorter last block cannot be equal
+        # to any other block
+        if not isinstalled(np) or not isinstance(self.base, (bytes, bytearray)):
+            return None
+        nfull = len(self.base) // self.bz
+        arr = np.frombuffer(self.base, dtype=np.uint8, count=nfull * self.bz)
+        return arr.reshape(nfull, self.bz)
+
     def _base_slice_from_block_slice(self, idx):
         bz = self.bz
         start, stop, step = indices_from_slice_or_index(
@@ -1,7 +1,7 @@
 # https://packaging.python.org/en/latest/distributing.html
 # https://github.com/pypa/sampleproject
 
-from setuptools import setup, find_packages
+from setuptools import setup, find_packages, Extension
 from codecs import open
 from os import path, system
 
@@ -57,6 +57,22 @@ extra_deps = {
             ]
         }
 
+# the compiled inner loops are optional: cryptonita falls back to
+# pure Python if Cython is missing or if the extension fails to build
+try:
+    from Cython.Build import cythonize
+    ext_modules = cythonize(
+        [
+            Extension(
+                'cryptonita._fastloops', ['cryptonita/_fastloops.pyx'],
+                optional=True
+            )
+        ],
+        language_level=3
+    )
+except ImportError:
+    ext_modules = []
+
 setup(
     name='cryptonita',
     version=__version__,
@@ -91,6 +107,7 @@ setup(
     # Let setuptools to find all the packages (aka modules and submodules)
     # automatically for us
     packages=find_packages(),
+    ext_modules=ext_modules,
     python_requires='>=3.3',
     install_requires=install_deps,
     extras_require=extra_deps,